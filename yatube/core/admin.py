@@ -0,0 +1,28 @@
+from django.contrib import admin
+
+from . import jobs
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'attempts',
+        'progress',
+        'run_after',
+        'locked_until',
+        'created',
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('key',)
+    empty_value_display = '-пусто-'
+
+    def progress(self, obj):
+        value = jobs.progress(obj)
+        return None if value is None else '{} из {}'.format(*value)
+    progress.short_description = 'Выполнено'
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,215 @@
+"""ASGI-обёртка над WSGI-приложением Django.
+
+Django 2.2 не умеет выполнять представления асинхронно, поэтому каждый
+запрос выполняется в пуле из max_workers потоков, а цикл событий только
+принимает тело запроса и отдаёт ответ по частям. Размер пула ограничивает
+число одновременных запросов к базе и память процесса.
+
+Потоковые ответы (StreamingHttpResponse, например события живых лент)
+отдаются по частям в отдельном пуле из stream_workers потоков: открытый
+на минуты поток не отнимает место у обычных запросов.
+
+Между потоком и циклом событий не больше BODY_QUEUE_SIZE частей: поток
+ждёт медленного клиента. Если клиент отключился, итератор ответа
+закрывается на следующей части, если приложение упало до отправки
+заголовков -- клиент получает 500.
+"""
+import asyncio
+import io
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DONE = object()
+BODY_QUEUE_SIZE = 16
+
+logger = logging.getLogger(__name__)
+
+
+def build_environ(scope, body):
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin1'),
+        'PATH_INFO': scope['path'].encode().decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('server'):
+        environ['SERVER_NAME'] = scope['server'][0]
+        environ['SERVER_PORT'] = str(scope['server'][1])
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_LENGTH', 'CONTENT_TYPE'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin1')
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    return environ
+
+
+def start_message(status, headers):
+    return {
+        'type': 'http.response.start',
+        'status': int(status.split(' ', 1)[0]),
+        'headers': [
+            (name.lower().encode('latin1'), value.encode('latin1'))
+            for name, value in headers
+        ],
+    }
+
+
+def body_message(chunk):
+    return {'type': 'http.response.body', 'body': chunk, 'more_body': True}
+
+
+async def send_error(send):
+    await send(start_message(
+        '500 Internal Server Error',
+        [('Content-Type', 'text/plain; charset=utf-8')],
+    ))
+    await send({'type': 'http.response.body', 'body': b'Server Error'})
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def send_chunks(response, put, closed):
+    """Выполняется в потоке пула: передаёт части ответа циклу событий."""
+    try:
+        for chunk in response:
+            if closed.is_set():
+                break
+            if chunk:
+                put(chunk)
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+        put(DONE)
+
+
+class WsgiToAsgi:
+    def __init__(self, wsgi_application, max_workers, stream_workers=None):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='asgi'
+        )
+        self.stream_executor = self.executor
+        if stream_workers:
+            self.stream_executor = ThreadPoolExecutor(
+                stream_workers, thread_name_prefix='asgi-stream'
+            )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported scope type {scope['type']}")
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        await self.respond(build_environ(scope, body), receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                self.stream_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def respond(self, environ, receive, send):
+        loop = asyncio.get_event_loop()
+        queue = asyncio.Queue(BODY_QUEUE_SIZE)
+
+        def put(item):
+            # Поток ждёт, пока в очереди не освободится место.
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def start_response(status, headers, exc_info=None):
+            put(start_message(status, headers))
+
+        try:
+            response = await loop.run_in_executor(
+                self.executor, self.wsgi_application, environ, start_response
+            )
+        except Exception:
+            logger.exception('Ошибка WSGI-приложения')
+            await send_error(send)
+            return
+        await self.stream(response, queue, put, receive, send)
+
+    async def stream(self, response, queue, put, receive, send):
+        loop = asyncio.get_event_loop()
+        closed = threading.Event()
+        executor = self.executor
+        if getattr(response, 'streaming', False):
+            executor = self.stream_executor
+        future = loop.run_in_executor(
+            executor, send_chunks, response, put, closed
+        )
+        disconnect = asyncio.ensure_future(wait_disconnect(receive))
+        started = finished = False
+        try:
+            started, finished = await self.forward(queue, disconnect, send)
+        finally:
+            disconnect.cancel()
+            if not finished:
+                # Клиент отключился: поток закроет итератор на следующей
+                # части, а очередь разбирается, чтобы он не повис на put.
+                closed.set()
+                while await queue.get() is not DONE:
+                    pass
+        try:
+            await future
+        except Exception:
+            logger.exception('Ошибка WSGI-приложения')
+            if finished and not started:
+                await send_error(send)
+                return
+        if finished:
+            await send({'type': 'http.response.body'})
+
+    async def forward(self, queue, disconnect, send):
+        """Отдаёт клиенту части ответа до DONE или до его отключения.
+
+        Возвращает (отправлены ли заголовки, дошёл ли ответ до конца).
+        """
+        started = False
+        while True:
+            get = asyncio.ensure_future(queue.get())
+            await asyncio.wait(
+                {get, disconnect}, return_when=asyncio.FIRST_COMPLETED
+            )
+            last = get.done() and get.result() is DONE
+            if disconnect.done() and not last:
+                get.cancel()
+                return started, False
+            item = get.result()
+            if item is DONE:
+                return started, True
+            if isinstance(item, dict):
+                started = True
+                await send(item)
+            else:
+                await send(body_message(item))
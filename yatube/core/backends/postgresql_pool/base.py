@@ -0,0 +1,90 @@
+import threading
+
+from django.db.backends.postgresql import base, creation
+from psycopg2 import pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Пул соединений psycopg2, ожидающий свободное соединение."""
+
+    def __init__(self, min_size, max_size, timeout, **conn_params):
+        self.pool = pool.ThreadedConnectionPool(
+            min_size, max_size, **conn_params
+        )
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.timeout = timeout
+
+    def getconn(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise pool.PoolError('connection pool exhausted')
+        try:
+            return self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def putconn(self, connection):
+        try:
+            self.pool.putconn(connection, close=bool(connection.closed))
+        finally:
+            self.slots.release()
+
+    def closeall(self):
+        self.pool.closeall()
+
+
+def close_pools():
+    """Закрывает простаивающие соединения, например перед DROP DATABASE."""
+    with _pools_lock:
+        for connection_pool in _pools.values():
+            connection_pool.closeall()
+        _pools.clear()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL, соединения которого берутся из общего пула процесса.
+
+    Django закрывает соединение в конце каждого запроса, а этот бэкенд
+    вместо закрытия возвращает его в пул. Размер пула задаётся ключами
+    POOL_MIN_SIZE, POOL_MAX_SIZE и POOL_TIMEOUT в настройках базы.
+    """
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params):
+        key = tuple(sorted(conn_params.items()))
+        with _pools_lock:
+            if key not in _pools:
+                _pools[key] = ConnectionPool(
+                    self.settings_dict.get('POOL_MIN_SIZE', 1),
+                    self.settings_dict.get('POOL_MAX_SIZE', 20),
+                    self.settings_dict.get('POOL_TIMEOUT', 30),
+                    **conn_params
+                )
+            return _pools[key]
+
+    def get_new_connection(self, conn_params):
+        self.connection_pool = self.get_pool(conn_params)
+        connection = self.connection_pool.getconn()
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.connection_pool.putconn(self.connection)
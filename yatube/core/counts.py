@@ -0,0 +1,67 @@
+"""Кэшированные и приблизительные COUNT(*) для пагинации.
+
+get_count(name, queryset) возвращает число объектов выборки из кэша,
+считая его в базе только при промахе. Код, который меняет данные,
+сбрасывает счётчик по тому же имени через invalidate(); COUNT_TIMEOUT
+ограничивает устаревание счётчиков, которые так не сбрасываются.
+
+Для выборки по всей таблице (table=модель) сначала смотрится оценка по
+статистике СУБД: pg_class.reltuples в PostgreSQL, sqlite_stat1 (после
+ANALYZE) в SQLite. Если оценка больше COUNT_ESTIMATE_THRESHOLD, она и
+возвращается с признаком approximate -- точный подсчёт такой таблицы
+стоит дороже, чем неточный номер последней страницы.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+
+COUNT_KEY = 'count:{}'
+ESTIMATE_KEY = 'count:estimate:{}'
+
+Count = namedtuple('Count', 'value approximate')
+
+
+def estimate(model):
+    """Число строк таблицы по статистике СУБД или None."""
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = (
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+        )
+    elif connection.vendor == 'sqlite':
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    value = int(str(row[0]).split()[0])
+    return value if value >= 0 else None
+
+
+def get_count(name, queryset, table=None, timeout=None):
+    if table is not None:
+        value = cache.get_or_set(
+            ESTIMATE_KEY.format(table._meta.db_table),
+            lambda: estimate(table) or 0,
+            settings.COUNT_TIMEOUT,
+        )
+        if value > settings.COUNT_ESTIMATE_THRESHOLD:
+            return Count(value, True)
+    key = COUNT_KEY.format(name)
+    value = cache.get(key)
+    if value is None:
+        value = queryset.count()
+        cache.set(key, value, timeout or settings.COUNT_TIMEOUT)
+    return Count(value, False)
+
+
+def invalidate(*names):
+    cache.delete_many([COUNT_KEY.format(name) for name in names])
@@ -0,0 +1,118 @@
+"""Удаление из CSS правил для классов, которые нигде не используются.
+
+Используемыми считаются все слова из шаблонов и скриптов: правило
+остаётся, если каждый класс хотя бы одного его селектора встречается
+среди этих слов. Слов берётся с запасом (а не только из class="..."),
+поэтому классы, собранные в шаблоне по условию, не теряются. Блоки
+@media и @supports чистятся рекурсивно, остальные @-правила остаются
+как есть.
+"""
+import re
+
+WORD_RE = re.compile(r'[A-Za-z_][\w-]*')
+CLASS_RE = re.compile(r'\.(-?[A-Za-z_][\w-]*)')
+NESTED_AT_RULES = ('@media', '@supports')
+
+
+def used_words(paths):
+    words = set()
+    for path in paths:
+        with open(path, encoding='utf-8') as source:
+            words.update(WORD_RE.findall(source.read()))
+    return words
+
+
+def skip_string(css, position):
+    quote = css[position]
+    position += 1
+    while position < len(css) and css[position] != quote:
+        position += 2 if css[position] == '\\' else 1
+    return position + 1
+
+
+def skip_comment(css, position):
+    end = css.find('*/', position + 2)
+    return len(css) if end < 0 else end + 2
+
+
+def closing_brace(css, position):
+    depth = 0
+    while position < len(css):
+        char = css[position]
+        if css.startswith('/*', position):
+            position = skip_comment(css, position)
+            continue
+        if char in '"\'':
+            position = skip_string(css, position)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return position
+        position += 1
+    return position
+
+
+def parse(css):
+    """Правила верхнего уровня: [(заголовок, тело или None)].
+
+    Комментарии отбрасываются, кроме лицензионных /*! ... */.
+    """
+    rules = []
+    start = position = 0
+    while position < len(css):
+        char = css[position]
+        if css.startswith('/*', position):
+            end = skip_comment(css, position)
+            if css.startswith('/*!', position):
+                rules.append((css[position:end], None))
+            position = start = end
+        elif char in '"\'':
+            position = skip_string(css, position)
+        elif char == ';':
+            rules.append((css[start:position + 1].strip(), None))
+            position = start = position + 1
+        elif char == '{':
+            end = closing_brace(css, position)
+            rules.append((css[start:position].strip(), css[position + 1:end]))
+            position = start = end + 1
+        else:
+            position += 1
+    return rules
+
+
+def split_selectors(prelude):
+    selectors, depth, start = [], 0, 0
+    for position, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:position])
+            start = position + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def purge(css, words):
+    output = []
+    for prelude, body in parse(css):
+        if body is None:
+            output.append(prelude)
+        elif prelude.startswith(NESTED_AT_RULES):
+            inner = purge(body, words)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [
+                selector for selector in split_selectors(prelude)
+                if all(name in words for name in CLASS_RE.findall(selector))
+            ]
+            if selectors:
+                output.append(f"{','.join(selectors)}{{{body}}}")
+    return ''.join(output)
@@ -0,0 +1,155 @@
+"""Очередь отложенных задач в таблице Job.
+
+Обработчик регистрируется декоратором @job('имя'), задача ставится
+через enqueue('имя', key=..., **аргументы) и выполняется воркером
+manage.py run_jobs. Задача с тем же key ставится только один раз.
+Упавшая задача повторяется с растущей задержкой, после JOBS_MAX_ATTEMPTS
+попыток получает статус failed. Воркер берёт задачу в аренду на
+JOBS_LEASE секунд: если он не завершил её за это время, задачу снова
+выполнит следующий run_pending(). Долгий обработчик может сообщать ход
+выполнения через report_progress(), он виден в списке задач админки.
+"""
+import json
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Job
+
+PROGRESS_KEY = 'job_progress:{}'
+
+handlers = {}
+_current = threading.local()
+
+
+def job(name):
+    def register(handler):
+        handlers[name] = handler
+        return handler
+    return register
+
+
+def enqueue(name, key=None, **payload):
+    payload = json.dumps(payload)
+    if key is None:
+        return Job.objects.create(name=name, payload=payload)
+    queued_job, _ = Job.objects.get_or_create(
+        key=key, defaults={'name': name, 'payload': payload}
+    )
+    return queued_job
+
+
+def claimable(now):
+    """Готовые задачи и задачи с истёкшей арендой."""
+    return (
+        Q(status=Job.PENDING, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+
+
+def claim(queued_job):
+    """Забирает задачу себе, если её не успел взять другой воркер.
+
+    Номер попытки в queued_job.attempts -- метка аренды: завершение
+    записывается, только пока задачу не забрали снова.
+    """
+    now = timezone.now()
+    claimed = Job.objects.filter(
+        claimable(now), id=queued_job.id, attempts=queued_job.attempts
+    ).update(
+        status=Job.RUNNING,
+        attempts=queued_job.attempts + 1,
+        locked_until=now + timedelta(seconds=settings.JOBS_LEASE),
+    ) == 1
+    if claimed:
+        queued_job.attempts += 1
+    return claimed
+
+
+def leased(queued_job):
+    return Job.objects.filter(
+        id=queued_job.id, status=Job.RUNNING, attempts=queued_job.attempts
+    )
+
+
+def report_progress(done, total):
+    """Сохраняет ход выполнения задачи, в которой вызван."""
+    queued_job = getattr(_current, 'job', None)
+    if queued_job is not None:
+        cache.set(
+            PROGRESS_KEY.format(queued_job.id), (done, total),
+            settings.JOBS_PROGRESS_TIMEOUT,
+        )
+
+
+def progress(queued_job):
+    """(сделано, всего) по последнему report_progress() или None."""
+    return cache.get(PROGRESS_KEY.format(queued_job.id))
+
+
+def execute(queued_job):
+    _current.job = queued_job
+    try:
+        handlers[queued_job.name](**json.loads(queued_job.payload))
+    except Exception:
+        attempts = queued_job.attempts
+        failed = attempts >= settings.JOBS_MAX_ATTEMPTS
+        leased(queued_job).update(
+            status=Job.FAILED if failed else Job.PENDING,
+            run_after=timezone.now() + timedelta(seconds=2 ** attempts),
+            last_error=traceback.format_exc(),
+            locked_until=None,
+        )
+        return False
+    finally:
+        _current.job = None
+    leased(queued_job).update(status=Job.DONE, locked_until=None)
+    return True
+
+
+def fail_abandoned(now):
+    # Задача, на которой воркер падал JOBS_MAX_ATTEMPTS раз, больше не
+    # забирается.
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        locked_until__lt=now,
+        attempts__gte=settings.JOBS_MAX_ATTEMPTS,
+    ).update(
+        status=Job.FAILED,
+        locked_until=None,
+        last_error='Воркер не завершил задачу за JOBS_LEASE',
+    )
+
+
+def run_pending(limit=100):
+    """Выполняет готовые к запуску задачи, возвращает их число."""
+    now = timezone.now()
+    fail_abandoned(now)
+    ready = Job.objects.filter(claimable(now))[:limit]
+    processed = 0
+    for queued_job in ready:
+        if claim(queued_job):
+            execute(queued_job)
+            processed += 1
+    return processed
+
+
+def queue_depth():
+    """Число задач по статусам: {'pending': 3, 'failed': 1, ...}."""
+    depth = dict.fromkeys((status for status, _ in Job.STATUSES), 0)
+    depth.update(
+        Job.objects.values_list('status').annotate(total=Count('id'))
+        .order_by()
+    )
+    return depth
+
+
+def prune_done(older_than):
+    return Job.objects.filter(
+        status=Job.DONE, created__lt=timezone.now() - older_than
+    ).delete()[0]
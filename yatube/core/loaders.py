@@ -0,0 +1,52 @@
+"""Загрузчики шаблонов, которые сжимают HTML один раз при компиляции.
+
+Из исходника шаблона удаляются HTML-комментарии, отступы и пустые
+строки. Перевод строки между тегами остаётся: для браузера это тот же
+пробел, поэтому вёрстка не меняется. Содержимое <pre> и <textarea> не
+трогается. Вместе с django.template.loaders.cached.Loader это делается
+один раз на процесс, а не на каждый запрос.
+
+Сжимаются только шаблоны с расширением из MINIFIED_EXTENSIONS: в
+текстовых письмах и robots.txt переводы строк и отступы значимы.
+"""
+import re
+
+from django.template.loaders import app_directories, filesystem
+
+MINIFIED_EXTENSIONS = ('.html',)
+COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+PRESERVED_RE = re.compile(
+    r'(<(pre|textarea)\b.*?</\2>)', re.DOTALL | re.IGNORECASE
+)
+
+
+def minify_html(source):
+    parts = PRESERVED_RE.split(source)
+    # split возвращает [текст, блок, имя тега, текст, блок, имя тега, ...].
+    for index in range(0, len(parts), 3):
+        text = COMMENT_RE.sub('', parts[index])
+        lines = (line.strip() for line in text.splitlines())
+        minified = '\n'.join(line for line in lines if line)
+        if text[:1].isspace() and index:
+            minified = ' ' + minified
+        if text[-1:].isspace() and index < len(parts) - 1:
+            minified += ' '
+        parts[index] = minified
+    del parts[2::3]
+    return ''.join(parts)
+
+
+class MinifyingMixin:
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if origin.name.endswith(MINIFIED_EXTENSIONS):
+            return minify_html(contents)
+        return contents
+
+
+class FilesystemLoader(MinifyingMixin, filesystem.Loader):
+    pass
+
+
+class AppDirectoriesLoader(MinifyingMixin, app_directories.Loader):
+    pass
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import WsgiToAsgi, build_environ
+
+
+def http_scope(path):
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность WSGI и ASGI (yatube/asgi.py) '
+        'при одинаковом числе потоков, без сети: запросы подаются '
+        'приложению напрямую.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/about/author/'])
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--concurrency', type=int, default=64,
+            help='Одновременных клиентов для ASGI.'
+        )
+
+    def handle(self, *args, **options):
+        wsgi_application = get_wsgi_application()
+        for path in options['paths']:
+            wsgi_rate = self.bench_wsgi(wsgi_application, path, options)
+            asgi_rate = asyncio.get_event_loop().run_until_complete(
+                self.bench_asgi(wsgi_application, path, options)
+            )
+            self.stdout.write(
+                f'{path}: WSGI {wsgi_rate:8.0f} запросов/с, '
+                f'ASGI {asgi_rate:8.0f} запросов/с '
+                f"({options['threads']} потоков)"
+            )
+
+    def bench_wsgi(self, wsgi_application, path, options):
+        def request(_):
+            environ = build_environ(http_scope(path), b'')
+            response = wsgi_application(environ, lambda *args: None)
+            b''.join(response)
+            response.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['threads']) as executor:
+            list(executor.map(request, range(options['requests'])))
+        return options['requests'] / (time.perf_counter() - started)
+
+    async def bench_asgi(self, wsgi_application, path, options):
+        application = WsgiToAsgi(wsgi_application, options['threads'])
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def send(message):
+            pass
+
+        async def request():
+            messages = [{'type': 'http.request', 'body': b''}]
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                # Клиент не отключается, пока ответ не отдан.
+                return await asyncio.Future()
+
+            async with semaphore:
+                await application(http_scope(path), receive, send)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(options['requests'])))
+        return options['requests'] / (time.perf_counter() - started)
@@ -0,0 +1,60 @@
+import copy
+import gzip
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from core.middleware import brotli
+
+PLAIN_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Для каждой страницы печатает размер HTML без сжатия шаблонов, '
+        'со сжатием (core.loaders) и после gzip/br, а также время '
+        'сжатия ответа.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/', '/about/tech/'])
+        parser.add_argument('--repeat', type=int, default=100)
+
+    def handle(self, *args, **options):
+        templates = copy.deepcopy(settings.TEMPLATES)
+        templates[0]['OPTIONS']['loaders'] = PLAIN_LOADERS
+        for path in options['paths']:
+            with override_settings(TEMPLATES=templates):
+                plain = self.fetch(path)
+            minified = self.fetch(path)
+            line = (
+                f'{path}: {len(plain)} -> {len(minified)} байт '
+                f'({1 - len(minified) / len(plain):.0%} меньше)'
+            )
+            compressors = [('gzip', lambda data: gzip.compress(data, 6))]
+            if brotli is not None:
+                compressors.append(('br', brotli.compress))
+            for name, compress in compressors:
+                size, cost = self.measure(compress, minified, options)
+                line += f', {name} {size} байт за {cost:.0f} мкс'
+            self.stdout.write(line)
+
+    def fetch(self, path):
+        cache.clear()
+        response = Client().get(path)
+        if response.status_code != 200:
+            raise SystemExit(f'{path}: ответ {response.status_code}')
+        return response.content
+
+    def measure(self, compress, content, options):
+        started = time.perf_counter()
+        for _ in range(options['repeat']):
+            compressed = compress(content)
+        elapsed = time.perf_counter() - started
+        return len(compressed), elapsed / options['repeat'] * 1e6
@@ -0,0 +1,67 @@
+import os
+import time
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test import RequestFactory, override_settings
+
+from core.staticfiles import serve_files
+
+
+def not_found(environ, start_response):
+    start_response('404 Not Found', [])
+    return [b'']
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает раздачу медиафайла через django.views.static.serve '
+        '(путь из urls.py при DEBUG) и через core.staticfiles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'name', nargs='?', help='Путь файла относительно MEDIA_ROOT.'
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        name = options['name'] or self.first_media_file()
+        environ = RequestFactory().get(settings.MEDIA_URL + name).environ
+        environ['wsgi.file_wrapper'] = FileWrapper
+        # urls.py подключает раздачу медиа только при DEBUG.
+        with override_settings(DEBUG=True):
+            django_rate = self.bench(get_wsgi_application(), environ, options)
+        files_rate = self.bench(serve_files(not_found), environ, options)
+        size = os.path.getsize(os.path.join(settings.MEDIA_ROOT, name))
+        self.stdout.write(
+            f'{name} ({size} байт): Django {django_rate:8.0f} запросов/с, '
+            f'core.staticfiles {files_rate:8.0f} запросов/с'
+        )
+
+    def first_media_file(self):
+        for root, _, names in os.walk(settings.MEDIA_ROOT):
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                return os.path.relpath(path, settings.MEDIA_ROOT)
+        raise SystemExit('В MEDIA_ROOT нет файлов')
+
+    def bench(self, application, environ, options):
+        statuses = []
+
+        def start_response(status, headers):
+            statuses.append(status)
+
+        started = time.perf_counter()
+        for _ in range(options['requests']):
+            response = application(dict(environ), start_response)
+            for _ in response:
+                pass
+            if hasattr(response, 'close'):
+                response.close()
+        elapsed = time.perf_counter() - started
+        if set(statuses) != {'200 OK'}:
+            raise SystemExit(f'Неожиданные ответы: {set(statuses)}')
+        return options['requests'] / elapsed
@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.urls import resolve, reverse
+
+from core import ratelimit
+from core.middleware import RateLimitMiddleware
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет накладные расходы core.ratelimit на запрос: отдельную '
+        'проверку ведра и проход через RateLimitMiddleware.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        cache.clear()
+        started = time.perf_counter()
+        for _ in range(count):
+            ratelimit.hit('bench', count + 1, 60)
+        self.report('ratelimit.hit', started, count)
+
+        path = reverse('posts:add_comment', args=[1])
+        request = RequestFactory().post(path)
+        request.user = get_user_model()(pk=0, username='bench')
+        request.resolver_match = resolve(path)
+        middleware = RateLimitMiddleware(lambda request: None)
+        rule = dict(
+            settings.RATELIMITS['posts:add_comment'],
+            limit=count + 1,
+            ip_limit=count + 1,
+        )
+        with override_settings(RATELIMITS={'posts:add_comment': rule}):
+            started = time.perf_counter()
+            for _ in range(count):
+                middleware.process_view(request, None, (), {})
+        self.report('RateLimitMiddleware', started, count)
+
+    def report(self, name, started, count):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name}: {elapsed / count * 1e6:.1f} мкс на запрос '
+            f'({count} запросов, кэш {settings.CACHES["default"]["BACKEND"]})'
+        )
@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import pragma_statements
+
+SCHEMA = (
+    'CREATE TABLE post ('
+    'id INTEGER PRIMARY KEY, text TEXT, author_id INTEGER, pub_date REAL)',
+    'CREATE INDEX post_pub_date ON post (pub_date)',
+)
+FEED_QUERY = 'SELECT id, text FROM post ORDER BY pub_date DESC LIMIT 10'
+INSERT_QUERY = 'INSERT INTO post (text, author_id, pub_date) VALUES (?, ?, ?)'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность чтения SQLite во время '
+        'пачек записей: настройки по умолчанию против SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=3.0)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--burst', type=int, default=200)
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument(
+            '--pause', type=float, default=0.01,
+            help='Пауза между пачками записей, в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('default', []),
+            ('tuned', pragma_statements(settings.SQLITE_PRAGMAS)),
+        )
+        for name, pragmas in profiles:
+            reads, writes, errors = self.run_profile(pragmas, options)
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{name:>8}: {reads / seconds:10.0f} чтений/с, '
+                f'{writes / seconds:8.0f} записей/с, ошибок: {errors}'
+            )
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        for statement in pragmas:
+            connection.execute(statement)
+        return connection
+
+    def run_profile(self, pragmas, options):
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        try:
+            setup = self.connect(path, pragmas)
+            for statement in SCHEMA:
+                setup.execute(statement)
+            setup.executemany(
+                INSERT_QUERY,
+                ((f'post {i}', i % 50, i) for i in range(options['rows'])),
+            )
+            setup.commit()
+            setup.close()
+            return self.measure(path, pragmas, options)
+        finally:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def measure(self, path, pragmas, options):
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        threads = [
+            threading.Thread(target=self.writer, args=(path, pragmas, options))
+        ] + [
+            threading.Thread(target=self.reader, args=(path, pragmas))
+            for _ in range(options['readers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return (
+            self.counters['reads'],
+            self.counters['writes'],
+            self.counters['errors'],
+        )
+
+    def count(self, key, value=1):
+        with self.lock:
+            self.counters[key] += value
+
+    def reader(self, path, pragmas):
+        connection = self.connect(path, pragmas)
+        while not self.stop.is_set():
+            try:
+                connection.execute(FEED_QUERY).fetchall()
+                self.count('reads')
+            except sqlite3.OperationalError:
+                self.count('errors')
+        connection.close()
+
+    def writer(self, path, pragmas, options):
+        connection = self.connect(path, pragmas)
+        rows = [('burst', 1, 0)] * options['burst']
+        while not self.stop.is_set():
+            try:
+                with connection:
+                    connection.executemany(INSERT_QUERY, rows)
+                self.count('writes', options['burst'])
+            except sqlite3.OperationalError:
+                self.count('errors')
+            time.sleep(options['pause'])
+        connection.close()
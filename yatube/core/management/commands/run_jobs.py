@@ -0,0 +1,37 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = 'Воркер очереди задач core.jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.'
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Показать глубину очереди и выйти.'
+        )
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for status, total in jobs.queue_depth().items():
+                self.stdout.write(f'{status}: {total}')
+            return
+        retention = timedelta(days=settings.JOBS_KEEP_DONE_DAYS)
+        while True:
+            processed = jobs.run_pending(options['batch_size'])
+            if options['once']:
+                break
+            if not processed:
+                jobs.prune_done(retention)
+                time.sleep(settings.JOBS_POLL_INTERVAL)
+        self.stdout.write(f'Выполнено задач: {processed}')
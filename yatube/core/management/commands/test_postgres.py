@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает тесты на временном экземпляре PostgreSQL '
+        '(нужен пакет pgserver). Аргументы передаются в manage.py test.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('test_labels', nargs='*')
+
+    def handle(self, *args, **options):
+        try:
+            import pgserver
+        except ImportError:
+            raise CommandError('Установите pgserver: pip install pgserver')
+        with tempfile.TemporaryDirectory() as data_dir:
+            server = pgserver.get_server(data_dir, cleanup_mode='stop')
+            env = dict(
+                os.environ,
+                DB_ENGINE='postgresql',
+                POSTGRES_DB='postgres',
+                POSTGRES_USER='postgres',
+                POSTGRES_HOST=data_dir,
+                POSTGRES_PORT='',
+            )
+            command = [sys.argv[0], 'test', *options['test_labels']]
+            try:
+                returncode = subprocess.call(
+                    [sys.executable, *command], env=env
+                )
+            finally:
+                server.cleanup()
+        if returncode:
+            raise CommandError('Тесты на PostgreSQL не прошли.')
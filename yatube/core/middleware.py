@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from . import pagecache, ratelimit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class RateLimitMiddleware:
+    """Отвечает 429 до вызова представления, если превышен RATELIMITS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        rule = settings.RATELIMITS.get(view_name)
+        if rule is None or request.method not in rule['methods']:
+            return None
+        retry_after = ratelimit.check(request, view_name, rule)
+        if not retry_after:
+            return None
+        response = HttpResponse(
+            'Слишком много запросов, попробуйте позже.',
+            content_type='text/plain; charset=utf-8',
+            status=429,
+        )
+        response['Retry-After'] = str(retry_after)
+        return response
+
+
+class AnonymousPageCacheMiddleware:
+    """Отдаёт анонимам страницы из core.pagecache до вызова представления.
+
+    Вошедшим те же страницы отдаются с Cache-Control: private, чтобы
+    прокси не показал их другим.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        match = request.resolver_match
+        if match is None or match.view_name not in settings.PAGE_CACHE_VIEWS:
+            return response
+        key = getattr(request, 'page_cache_key', None)
+        if key is None:
+            if not pagecache.is_cacheable_request(request):
+                patch_cache_control(response, private=True)
+        elif pagecache.is_cacheable_response(request, response):
+            pagecache.patch_public(response)
+            pagecache.set_page(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        if (view_name not in settings.PAGE_CACHE_VIEWS
+                or not pagecache.is_cacheable_request(request)):
+            return None
+        key = pagecache.page_key(request)
+        response = pagecache.get_page(key)
+        if response is None:
+            pagecache.start_page(request, key)
+        return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Сжимает ответ в br, если клиент его принимает и установлен пакет
+    brotli, иначе -- в gzip, как GZipMiddleware.
+
+    Потоковые ответы не сжимаются: compress_sequence не сбрасывает буфер
+    после каждой части, и события text/event-stream дошли бы до браузера
+    только при закрытии потока.
+    """
+
+    def process_response(self, request, response):
+        if (response.streaming or response.get(
+                'Content-Type', '').startswith('text/event-stream')):
+            return response
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if (brotli is None or 'br' not in accepted
+                or response.has_header('Content-Encoding')
+                or len(response.content) < 200):
+            return super().process_response(request, response)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        if response.has_header('ETag'):
+            response['ETag'] = response['ETag'].rstrip('"') + ';br"'
+        response['Content-Encoding'] = 'br'
+        return response
@@ -0,0 +1,113 @@
+"""Кэш готовых страниц для анонимных посетителей.
+
+Кэшируются ответы на GET и HEAD к представлениям из PAGE_CACHE_VIEWS,
+если в запросе нет cookie сессии. Ключ -- хост, путь с параметрами и
+язык.
+
+Страница зависит от тегов: общего ALL и тех, что представление отметило
+через depends_on(request, тег, ...). У каждого тега своя версия, со
+страницей хранятся версии на момент отрисовки. purge(тег, ...)
+увеличивает версии, и страницы, зависящие от этих тегов, перестают
+находиться в кэше, остальные остаются. Старые страницы истекают по
+PAGE_CACHE_TIMEOUT.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import translation
+from django.utils.cache import (
+    cc_delim_re, patch_cache_control, patch_vary_headers,
+)
+
+ALL = 'all'
+VERSION_KEY = 'page:version:{}'
+PAGE_KEY = 'page:{}:{}'
+
+
+def new_version():
+    # Версия тега, вытесненного из кэша, начинается заново с числа,
+    # которого не было у сохранённых страниц.
+    return int(time.time() * 1000000)
+
+
+def version(tag=ALL):
+    return cache.get_or_set(VERSION_KEY.format(tag), new_version, None)
+
+
+def purge(*tags):
+    for tag in tags or (ALL,):
+        try:
+            cache.incr(VERSION_KEY.format(tag))
+        except ValueError:
+            # Версии нет -- страницы с этим тегом и так не найдутся.
+            pass
+
+
+def page_key(request):
+    url = request.build_absolute_uri().encode()
+    return PAGE_KEY.format(
+        translation.get_language(), hashlib.md5(url).hexdigest()
+    )
+
+
+def start_page(request, key):
+    """Запоминает ключ и версию ALL страницы, которую надо сохранить."""
+    request.page_cache_key = key
+    request.page_cache_versions = {ALL: version()}
+
+
+def depends_on(request, *tags):
+    """Отмечает теги страницы; версии берутся до чтения данных."""
+    versions = getattr(request, 'page_cache_versions', None)
+    if versions is not None:
+        versions.update((tag, version(tag)) for tag in tags)
+
+
+def get_page(key):
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    versions, response = entry
+    tags = {VERSION_KEY.format(tag): tag for tag in versions}
+    current = {
+        tags[name]: value for name, value in cache.get_many(tags).items()
+    }
+    return response if current == versions else None
+
+
+def set_page(request, response):
+    cache.set(
+        request.page_cache_key,
+        (request.page_cache_versions, response),
+        settings.PAGE_CACHE_TIMEOUT,
+    )
+
+
+def is_cacheable_request(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def is_cacheable_response(request, response):
+    directives = cc_delim_re.split(response.get('Cache-Control', ''))
+    return (
+        response.status_code == 200
+        # Страница с CSRF-токеном привязана к cookie одного посетителя.
+        and not request.META.get('CSRF_COOKIE_USED')
+        and not response.streaming
+        and not response.cookies
+        and 'private' not in directives
+        and 'no-store' not in directives
+    )
+
+
+def patch_public(response):
+    """Разрешает прокси хранить страницу, но отдельно для вошедших."""
+    patch_cache_control(
+        response, public=True, max_age=settings.PAGE_CACHE_MAX_AGE
+    )
+    patch_vary_headers(response, ('Cookie', 'Accept-Language'))
@@ -0,0 +1,91 @@
+"""Paginator с окном номеров страниц.
+
+Вместо ссылки на каждую страницу шаблон получает page_obj.window:
+первые и последние PAGINATOR_ON_ENDS страниц, PAGINATOR_ON_EACH_SIDE
+страниц вокруг текущей и ELLIPSIS на месте пропусков.
+
+Число объектов можно передать заранее (count -- число или функция),
+тогда COUNT(*) не выполняется. Если оно приблизительное
+(approximate=True), последние страницы в окне не показываются: их номера
+неточны.
+
+CachedCountPaginator -- для списков админки: число объектов выборки
+берётся из core.counts, а для нефильтрованной большой таблицы -- оценкой
+по статистике СУБД.
+"""
+from hashlib import md5
+
+from django.conf import settings
+from django.core import paginator
+from django.core.exceptions import EmptyResultSet
+from django.utils.functional import cached_property
+
+from . import counts
+
+ELLIPSIS = '…'
+
+
+class Paginator(paginator.Paginator):
+    ELLIPSIS = ELLIPSIS
+
+    def __init__(self, object_list, per_page, count=None,
+                 approximate=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            # count -- cached_property, значение экземпляра его заменяет.
+            self.count = count() if callable(count) else count
+        self.approximate = approximate
+
+    def _get_page(self, *args, **kwargs):
+        # Класс страницы остаётся django.core.paginator.Page.
+        page = super()._get_page(*args, **kwargs)
+        page.window = self.page_window(page.number)
+        return page
+
+    def page_window(self, number):
+        on_each_side = settings.PAGINATOR_ON_EACH_SIDE
+        on_ends = settings.PAGINATOR_ON_ENDS
+        last = self.num_pages
+        window = []
+        if number > on_each_side + on_ends + 2:
+            window.extend(range(1, on_ends + 1))
+            window.append(ELLIPSIS)
+            window.extend(range(number - on_each_side, number + 1))
+        else:
+            window.extend(range(1, number + 1))
+        if self.approximate:
+            window.extend(
+                range(number + 1, min(number + on_each_side, last) + 1)
+            )
+            if number + on_each_side < last:
+                window.append(ELLIPSIS)
+        elif number < last - on_each_side - on_ends - 1:
+            window.extend(range(number + 1, number + on_each_side + 1))
+            window.append(ELLIPSIS)
+            window.extend(range(last - on_ends + 1, last + 1))
+        else:
+            window.extend(range(number + 1, last + 1))
+        return window
+
+
+class CachedCountPaginator(paginator.Paginator):
+    approximate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return 0
+        model = queryset.model
+        name = '{}:{}'.format(
+            model._meta.db_table, md5(sql.encode('utf-8')).hexdigest()
+        )
+        total = counts.get_count(
+            name, queryset,
+            table=None if queryset.query.has_filters() else model,
+            timeout=settings.ADMIN_COUNT_TIMEOUT,
+        )
+        self.approximate = total.approximate
+        return total.value
@@ -0,0 +1,150 @@
+"""Публикация событий по каналам и подписка на них.
+
+Брокер задаётся настройкой PUBSUB_BROKER:
+
+    LocalBroker -- очереди в памяти процесса. События видят только
+        подписчики того же процесса (runserver, один воркер);
+    CacheBroker -- события канала лежат в общем кэше под растущими
+        номерами, подписчик опрашивает счётчики каналов. Работает между
+        процессами, если кэш общий (memcached, redis).
+
+Подписка возвращает объект с методами get(timeout) -- список сообщений,
+пришедших с прошлого вызова, пустой по истечении timeout, -- и close().
+"""
+import queue
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+COUNTER_KEY = 'pubsub:{}'
+EVENT_KEY = 'pubsub:{}:{}'
+
+
+class LocalSubscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = set(channels)
+        self.messages = queue.Queue(settings.PUBSUB_QUEUE_SIZE)
+
+    def put(self, message):
+        try:
+            self.messages.put_nowait(message)
+        except queue.Full:
+            # Медленный подписчик теряет события, но не тормозит публикацию.
+            pass
+
+    def get(self, timeout):
+        try:
+            messages = [self.messages.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def subscribe(self, channels):
+        subscription = LocalSubscription(self, channels)
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscriptions[channel].discard(subscription)
+                if not self.subscriptions[channel]:
+                    del self.subscriptions[channel]
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+
+def channel_counters(channels):
+    keys = {COUNTER_KEY.format(channel): channel for channel in channels}
+    counters = cache.get_many(keys)
+    return {channel: counters.get(key, 0) for key, channel in keys.items()}
+
+
+class CacheSubscription:
+    def __init__(self, channels):
+        # Читаются только события, опубликованные после подписки.
+        self.positions = channel_counters(channels)
+
+    def poll(self):
+        keys = []
+        history = settings.PUBSUB_HISTORY
+        for channel, last in channel_counters(self.positions).items():
+            first = max(self.positions[channel], last - history)
+            keys.extend(
+                EVENT_KEY.format(channel, number)
+                for number in range(first + 1, last + 1)
+            )
+            self.positions[channel] = last
+        if not keys:
+            return []
+        events = cache.get_many(keys)
+        return [events[key] for key in keys if key in events]
+
+    def get(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            messages = self.poll()
+            left = deadline - time.monotonic()
+            if messages or left <= 0:
+                return messages
+            time.sleep(min(settings.PUBSUB_POLL_INTERVAL, left))
+
+    def close(self):
+        pass
+
+
+class CacheBroker:
+    def subscribe(self, channels):
+        return CacheSubscription(channels)
+
+    def publish(self, channel, message):
+        counter = COUNTER_KEY.format(channel)
+        cache.add(counter, 0, None)
+        number = cache.incr(counter)
+        cache.set(
+            EVENT_KEY.format(channel, number),
+            message,
+            settings.PUBSUB_EVENT_TIMEOUT,
+        )
+
+
+@lru_cache()
+def load_broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return load_broker(settings.PUBSUB_BROKER)
+
+
+def publish(channel, message):
+    get_broker().publish(channel, message)
+
+
+def subscribe(channels):
+    return get_broker().subscribe(channels)
@@ -0,0 +1,80 @@
+"""Ограничение частоты запросов к пишущим представлениям.
+
+Правила задаются в RATELIMITS по имени URL: сколько запросов указанных
+методов разрешено за period секунд одному пользователю (limit) и одному
+IP-адресу (ip_limit). Счётчики лежат в кэше и увеличиваются атомарно
+через cache.incr.
+
+Честное ведро токенов требует сравнения с обменом, которого нет в API
+кэша Django, поэтому используется скользящее окно из двух счётчиков:
+запросы прошлого окна учитываются с весом, убывающим к его концу. Это
+даёт ту же среднюю скорость и тот же допустимый всплеск, что и ведро
+ёмкостью limit, пополняемое за period секунд.
+
+За обратным прокси REMOTE_ADDR -- адрес прокси. X-Forwarded-For читается
+только от адресов из RATELIMIT_TRUSTED_PROXIES, иначе клиент подставил
+бы в него любой адрес и обошёл ip_limit.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+RATELIMIT_KEY = 'ratelimit:{}:{}:{}'
+
+
+def hit(bucket, limit, period, now=None):
+    """Учитывает запрос в ведре bucket.
+
+    Возвращает 0, если запрос укладывается в limit, иначе -- через
+    сколько секунд стоит повторить.
+    """
+    now = time.time() if now is None else now
+    window, elapsed = divmod(now, period)
+    key = RATELIMIT_KEY.format(bucket, period, int(window))
+    cache.add(key, 0, period * 2)
+    try:
+        current = cache.incr(key)
+    except ValueError:
+        # Ключ успел истечь между add и incr.
+        cache.add(key, 1, period * 2)
+        current = 1
+    previous = cache.get(
+        RATELIMIT_KEY.format(bucket, period, int(window) - 1)
+    )
+    weight = 1 - elapsed / period
+    if current + (previous or 0) * weight <= limit:
+        return 0
+    return int(period - elapsed) + 1
+
+
+def client_ip(request):
+    """Адрес клиента: последний в цепочке, кто не доверенный прокси."""
+    trusted = settings.RATELIMIT_TRUSTED_PROXIES
+    address = request.META.get('REMOTE_ADDR', '')
+    forwarded = [
+        part.strip()
+        for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+        if part.strip()
+    ]
+    # Каждый прокси дописывает адрес справа, левые части мог задать
+    # сам клиент.
+    while address in trusted and forwarded:
+        address = forwarded.pop()
+    return address
+
+
+def check(request, view_name, rule):
+    """Через сколько секунд можно повторить запрос, 0 -- можно сейчас."""
+    period = rule['period']
+    retry_after = 0
+    if request.user.is_authenticated:
+        retry_after = hit(
+            f'{view_name}:user:{request.user.pk}', rule['limit'], period
+        )
+    ip_limit = rule.get('ip_limit')
+    if ip_limit and not retry_after:
+        retry_after = hit(
+            f'{view_name}:ip:{client_ip(request)}', ip_limit, period
+        )
+    return retry_after
@@ -0,0 +1,145 @@
+"""Раздача статики и медиафайлов WSGI-обёрткой, без вызова Django.
+
+Неизменяемые файлы -- собранная статика с хэшем в имени и миниатюры
+sorl-thumbnail (их имя -- хэш исходника и параметров) -- отдаются с
+Cache-Control: immutable на год, остальные -- с коротким max-age.
+Если клиент принимает br или gzip и рядом лежит сжатая копия, отдаётся
+она. Поддерживаются ETag (ответ 304) и запросы одного диапазона байт
+(206). Файл целиком передаётся через wsgi.file_wrapper: gunicorn и uWSGI
+отправляют его системным вызовом sendfile, не читая в Python.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+
+HASHED_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+THUMBNAIL_RE = re.compile(r'^cache/')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def read_chunks(source, length):
+    with source:
+        while length > 0:
+            chunk = source.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def parse_range(header, size):
+    """(начало, конец) диапазона включительно или None, если он не
+    задан или составной; ValueError, если диапазон вне файла."""
+    match = RANGE_RE.match(header.strip())
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+class StaticFiles:
+    def __init__(self, application, root, prefix, max_age=60,
+                 immutable=HASHED_RE):
+        self.application = application
+        self.root = os.path.abspath(root) if root else None
+        self.prefix = prefix
+        self.max_age = max_age
+        self.immutable = immutable
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if (self.root and path.startswith(self.prefix)
+                and environ['REQUEST_METHOD'] in ('GET', 'HEAD')):
+            name = path[len(self.prefix):]
+            filename = self.find(name)
+            if filename is not None:
+                return self.serve(environ, start_response, name, filename)
+        return self.application(environ, start_response)
+
+    def find(self, name):
+        filename = os.path.abspath(os.path.join(self.root, name))
+        if not filename.startswith(self.root + os.sep):
+            return None
+        return filename if os.path.isfile(filename) else None
+
+    def choose_encoding(self, environ, filename):
+        accepted = environ.get('HTTP_ACCEPT_ENCODING', '')
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(filename + suffix):
+                return encoding, filename + suffix
+        return None, filename
+
+    def headers(self, name, filename):
+        content_type, _ = mimetypes.guess_type(filename)
+        content_type = content_type or 'application/octet-stream'
+        headers = [('Content-Type', content_type), ('Accept-Ranges', 'bytes')]
+        if self.immutable.search(name):
+            headers.append(('Cache-Control', IMMUTABLE))
+        else:
+            headers.append(
+                ('Cache-Control', f'public, max-age={self.max_age}')
+            )
+        if any(os.path.isfile(filename + suffix) for _, suffix in ENCODINGS):
+            headers.append(('Vary', 'Accept-Encoding'))
+        return headers
+
+    def serve(self, environ, start_response, name, filename):
+        headers = self.headers(name, filename)
+        encoding, filename = self.choose_encoding(environ, filename)
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        stat = os.stat(filename)
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        headers.append(('ETag', etag))
+        if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+            start_response('304 Not Modified', headers)
+            return []
+        status, start, length = '200 OK', 0, size
+        if 'HTTP_RANGE' in environ and not encoding:
+            try:
+                byte_range = parse_range(environ['HTTP_RANGE'], size)
+            except ValueError:
+                headers.append(('Content-Range', f'bytes */{size}'))
+                start_response('416 Range Not Satisfiable', headers)
+                return []
+            if byte_range is not None:
+                start, end = byte_range
+                status, length = '206 Partial Content', end - start + 1
+                headers.append(
+                    ('Content-Range', f'bytes {start}-{end}/{size}')
+                )
+        headers.append(('Content-Length', str(length)))
+        start_response(status, headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        source = open(filename, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if length == size and file_wrapper is not None:
+            return file_wrapper(source, CHUNK_SIZE)
+        source.seek(start)
+        return read_chunks(source, length)
+
+
+def serve_files(application):
+    """Оборачивает приложение раздачей STATIC_ROOT и MEDIA_ROOT."""
+    application = StaticFiles(
+        application, settings.MEDIA_ROOT, settings.MEDIA_URL,
+        max_age=settings.MEDIA_MAX_AGE, immutable=THUMBNAIL_RE,
+    )
+    return StaticFiles(
+        application, settings.STATIC_ROOT, settings.STATIC_URL
+    )
@@ -0,0 +1,98 @@
+"""Хранилище статики для collectstatic.
+
+Поверх ManifestStaticFilesStorage (имена с хэшем содержимого):
+
+    * файлы из STATIC_PURGE_CSS перед хэшированием очищаются от правил
+      для неиспользуемых классов (core.csspurge);
+    * для текстовых файлов рядом кладутся сжатые копии .gz и, если
+      установлен пакет brotli, .br -- их отдаёт core.staticfiles;
+    * ссылка на файл, которого нет в манифесте (collectstatic не
+      запускался, как в тестах), остаётся без хэша, а не роняет страницу.
+"""
+import gzip
+import io
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from . import csspurge
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.txt', '.html', '.json', '.xml')
+
+
+def purge_sources():
+    """Шаблоны и скрипты, по которым определяются используемые классы."""
+    for finder in get_finders():
+        for path, storage in finder.list([]):
+            if path.endswith('.js'):
+                yield storage.path(path)
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for root, _, names in os.walk(directory):
+            for name in names:
+                if name.endswith('.html'):
+                    yield os.path.join(root, name)
+
+
+def gzip_compress(content):
+    # mtime=0: одинаковый файл даёт одинаковый архив при каждой сборке.
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as archive:
+        archive.write(content)
+    return buffer.getvalue()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = self.purge_css(paths)
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            for name in self.hashed_files.values():
+                if name.endswith(COMPRESSIBLE):
+                    self.compress(name)
+
+    def purge_css(self, paths):
+        """Чистит собранные копии стилей и хэширует уже их, а не исходники."""
+        names = [name for name in settings.STATIC_PURGE_CSS if name in paths]
+        if not names:
+            return paths
+        words = csspurge.used_words(purge_sources())
+        paths = dict(paths)
+        for name in names:
+            source_storage, source_path = paths[name]
+            with source_storage.open(source_path) as source:
+                css = source.read().decode('utf-8')
+            self.delete(name)
+            self._save(name, ContentFile(
+                csspurge.purge(css, words).encode('utf-8')
+            ))
+            paths[name] = (self, name)
+        return paths
+
+    def compress(self, name):
+        with self.open(name) as source:
+            content = source.read()
+        variants = {'.gz': gzip_compress(content)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content)
+        for suffix, compressed in variants.items():
+            if len(compressed) < len(content):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
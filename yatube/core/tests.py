@@ -1,4 +1,30 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.template import Context, Engine
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.jobs import follow_created
+from posts.models import Comment, Group, Post, User
+
+from . import csspurge, jobs, pubsub, ratelimit
+from .asgi import BODY_QUEUE_SIZE, WsgiToAsgi
+from .loaders import minify_html
+from .paginator import ELLIPSIS, Paginator
+from .models import Job
+from .staticfiles import StaticFiles, THUMBNAIL_RE
 
 
 class ViewTestClass(TestCase):
@@ -7,3 +33,660 @@ class ViewTestClass(TestCase):
         template = 'core/404.html'
         self.assertEqual(response.status_code, 404)
         self.assertTemplateUsed(response, template)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'нужен SQLite')
+class SQLitePragmasTest(TestCase):
+    def test_connection_uses_configured_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            synchronous = cursor.fetchone()[0]
+            cursor.execute('PRAGMA cache_size')
+            cache_size = cursor.fetchone()[0]
+        self.assertEqual(synchronous, 1)
+        self.assertEqual(cache_size, settings.SQLITE_PRAGMAS['cache_size'])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'нужен PostgreSQL')
+class PostgreSQLTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {i}') for i in range(5)
+        )
+
+    def test_pool_reuses_connections(self):
+        from core.backends.postgresql_pool.base import ConnectionPool
+        pool = ConnectionPool(1, 2, 1, **connection.get_connection_params())
+        first = pool.getconn()
+        pool.putconn(first)
+        second = pool.getconn()
+        pool.putconn(second)
+        pool.closeall()
+        self.assertIs(first, second)
+
+    def test_iterator_uses_server_side_cursor(self):
+        posts = list(Post.objects.iterator(chunk_size=2))
+        self.assertEqual(len(posts), 5)
+
+    def test_index_feed_can_use_pub_date_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = Post.objects.all()[:settings.POSTS_PER_PAGE].explain()
+        self.assertIn('post_pub_date_idx', plan)
+
+
+@jobs.job('tests.flaky')
+def flaky_job(fail):
+    if fail:
+        raise ValueError('сбой')
+
+
+@override_settings(JOBS_MAX_ATTEMPTS=2)
+class JobQueueTest(TestCase):
+    def test_enqueue_is_idempotent_by_key(self):
+        jobs.enqueue('tests.flaky', key='once', fail=False)
+        jobs.enqueue('tests.flaky', key='once', fail=False)
+        self.assertEqual(jobs.queue_depth()[Job.PENDING], 1)
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(jobs.queue_depth()[Job.DONE], 1)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        queued_job = jobs.enqueue('tests.flaky', fail=True)
+        jobs.run_pending()
+        queued_job.refresh_from_db()
+        self.assertEqual(queued_job.status, Job.PENDING)
+        self.assertGreater(queued_job.run_after, timezone.now())
+        self.assertIn('ValueError', queued_job.last_error)
+        self.assertEqual(jobs.run_pending(), 0)
+        Job.objects.update(run_after=timezone.now())
+        jobs.run_pending()
+        queued_job.refresh_from_db()
+        self.assertEqual(queued_job.status, Job.FAILED)
+        self.assertEqual(queued_job.attempts, 2)
+
+    def test_expired_lease_is_reclaimed(self):
+        queued_job = jobs.enqueue('tests.flaky', fail=False)
+        self.assertTrue(jobs.claim(queued_job))
+        # Второй воркер не берёт задачу, пока аренда не истекла.
+        self.assertFalse(jobs.claim(queued_job))
+        self.assertEqual(jobs.run_pending(), 0)
+        Job.objects.update(locked_until=timezone.now())
+        self.assertEqual(jobs.run_pending(), 1)
+        queued_job.refresh_from_db()
+        self.assertEqual(queued_job.status, Job.DONE)
+        self.assertEqual(queued_job.attempts, 2)
+        self.assertIsNone(queued_job.locked_until)
+
+    def test_stale_worker_does_not_overwrite_state(self):
+        queued_job = jobs.enqueue('tests.flaky', fail=True)
+        stale = Job.objects.get(id=queued_job.id)
+        self.assertTrue(jobs.claim(stale))
+        Job.objects.update(locked_until=timezone.now())
+        current = Job.objects.get(id=queued_job.id)
+        self.assertTrue(jobs.claim(current))
+        # Первый воркер закончил после того, как задачу забрал второй.
+        self.assertFalse(jobs.execute(stale))
+        queued_job.refresh_from_db()
+        self.assertEqual(queued_job.status, Job.RUNNING)
+        self.assertEqual(queued_job.last_error, '')
+        self.assertFalse(jobs.execute(current))
+        queued_job.refresh_from_db()
+        self.assertEqual(queued_job.status, Job.FAILED)
+
+    def test_abandoned_job_fails(self):
+        queued_job = jobs.enqueue('tests.flaky', fail=False)
+        Job.objects.update(
+            status=Job.RUNNING, attempts=2, locked_until=timezone.now()
+        )
+        self.assertEqual(jobs.run_pending(), 0)
+        queued_job.refresh_from_db()
+        self.assertEqual(queued_job.status, Job.FAILED)
+
+
+def http_scope(path):
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+    }
+
+
+def http_receive(disconnected=None):
+    """receive(): тело запроса, затем ждёт отключения клиента."""
+    messages = [{'type': 'http.request', 'body': b''}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        if disconnected is None:
+            return await asyncio.Future()
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    return receive
+
+
+class Chunks:
+    """WSGI-ответ из бесконечных частей, запоминает закрытие."""
+
+    def __init__(self):
+        self.produced = 0
+        self.closed = False
+
+    def __iter__(self):
+        while not self.closed:
+            self.produced += 1
+            yield b'chunk'
+
+    def close(self):
+        self.closed = True
+
+
+class WsgiToAsgiTest(TestCase):
+    def run_app(self, application, path='/', disconnected=None, send=None):
+        messages = []
+
+        async def collect(message):
+            messages.append(message)
+            if send is not None:
+                await send(message)
+
+        asyncio.get_event_loop().run_until_complete(asyncio.wait_for(
+            application(http_scope(path), http_receive(disconnected), collect),
+            5,
+        ))
+        return messages
+
+    def test_serves_django_pages(self):
+        application = WsgiToAsgi(get_wsgi_application(), max_workers=2)
+        messages = self.run_app(application, '/about/author/')
+        self.assertEqual(messages[0]['status'], 200)
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        self.assertIn('<title>О сайте</title>'.encode(), body)
+        self.assertFalse(messages[-1].get('more_body'))
+
+    def test_application_error_is_500(self):
+        def broken(environ, start_response):
+            raise RuntimeError('broken')
+
+        def broken_iterator(environ, start_response):
+            def chunks():
+                raise RuntimeError('broken')
+                yield b''
+            return chunks()
+
+        for app in (broken, broken_iterator):
+            with self.subTest(app=app.__name__):
+                with self.assertLogs('core.asgi', 'ERROR'):
+                    messages = self.run_app(WsgiToAsgi(app, max_workers=1))
+                self.assertEqual(messages[0]['status'], 500)
+                self.assertFalse(messages[-1].get('more_body'))
+
+    def test_disconnect_closes_iterator(self):
+        response = Chunks()
+
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return response
+
+        disconnected = asyncio.Event()
+
+        async def send(message):
+            if message.get('body'):
+                disconnected.set()
+
+        self.run_app(WsgiToAsgi(app, max_workers=1), '/', disconnected, send)
+        self.assertTrue(response.closed)
+
+    def test_slow_client_applies_backpressure(self):
+        response = Chunks()
+        sent = []
+
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return response
+
+        disconnected = asyncio.Event()
+
+        async def send(message):
+            sent.append(message)
+            await asyncio.sleep(0.001)
+            # Поток не уходит вперёд дальше размера очереди.
+            self.assertLessEqual(
+                response.produced - len(sent), BODY_QUEUE_SIZE + 2
+            )
+            if len(sent) > 100:
+                disconnected.set()
+
+        self.run_app(WsgiToAsgi(app, max_workers=1), '/', disconnected, send)
+        self.assertTrue(response.closed)
+
+    @override_settings(LIVE_STREAM_TIMEOUT=2, LIVE_HEARTBEAT=0.1)
+    def test_streams_do_not_block_requests(self):
+        application = WsgiToAsgi(
+            get_wsgi_application(), max_workers=2, stream_workers=4
+        )
+
+        async def request(path, started=None):
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+                if started is not None and message.get('body'):
+                    started.set()
+
+            await application(http_scope(path), http_receive(), send)
+            return messages
+
+        async def scenario():
+            events = [asyncio.Event() for _ in range(3)]
+            streams = [
+                asyncio.ensure_future(request('/events/', started))
+                for started in events
+            ]
+            for started in events:
+                await asyncio.wait_for(started.wait(), 1)
+            # Потоков событий больше, чем max_workers, а запрос проходит.
+            messages = await asyncio.wait_for(request('/about/author/'), 1)
+            self.assertFalse(any(stream.done() for stream in streams))
+            await asyncio.gather(*streams)
+            return messages
+
+        messages = asyncio.get_event_loop().run_until_complete(scenario())
+        self.assertEqual(messages[0]['status'], 200)
+
+
+class PubSubTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def check_broker(self, broker):
+        subscription = broker.subscribe(['first', 'second'])
+        broker.publish('first', 1)
+        broker.publish('other', 2)
+        broker.publish('second', 3)
+        self.assertEqual(subscription.get(timeout=0.1), [1, 3])
+        self.assertEqual(subscription.get(timeout=0.1), [])
+        subscription.close()
+
+    def test_local_broker(self):
+        broker = pubsub.LocalBroker()
+        self.check_broker(broker)
+        self.assertEqual(dict(broker.subscriptions), {})
+
+    @override_settings(PUBSUB_POLL_INTERVAL=0.01)
+    def test_cache_broker(self):
+        self.check_broker(pubsub.CacheBroker())
+
+    @override_settings(PUBSUB_HISTORY=2)
+    def test_cache_broker_keeps_recent_history(self):
+        broker = pubsub.CacheBroker()
+        subscription = broker.subscribe(['channel'])
+        for message in range(5):
+            broker.publish('channel', message)
+        self.assertEqual(subscription.get(timeout=0), [3, 4])
+
+
+@override_settings(RATELIMITS={
+    'posts:add_comment': {
+        'methods': ['POST'], 'limit': 2, 'ip_limit': 3, 'period': 60,
+    },
+})
+class RateLimitTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='spammer')
+        cls.other = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:add_comment', args=[self.post.id])
+
+    def comment(self, user):
+        client = Client()
+        client.force_login(user)
+        return client.post(self.url, {'text': 'Комментарий'})
+
+    def test_user_bucket(self):
+        self.assertEqual(self.comment(self.user).status_code, 302)
+        self.assertEqual(self.comment(self.user).status_code, 302)
+        response = self.comment(self.user)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(int(response['Retry-After']) > 0)
+        self.assertEqual(self.post.comments.count(), 2)
+
+    def test_ip_bucket(self):
+        self.comment(self.user)
+        self.comment(self.user)
+        self.assertEqual(self.comment(self.other).status_code, 302)
+        self.assertEqual(self.comment(self.other).status_code, 429)
+
+    def test_other_methods_are_not_limited(self):
+        for _ in range(5):
+            self.assertNotEqual(Client().get(self.url).status_code, 429)
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=['10.0.0.1', '10.0.0.2'])
+    def test_client_ip(self):
+        factory = RequestFactory()
+        cases = (
+            ('1.2.3.4', '', '1.2.3.4'),
+            # Заголовок не от прокси подделан клиентом.
+            ('1.2.3.4', '5.6.7.8', '1.2.3.4'),
+            ('10.0.0.1', '5.6.7.8', '5.6.7.8'),
+            ('10.0.0.1', '9.9.9.9, 5.6.7.8, 10.0.0.2', '5.6.7.8'),
+            ('10.0.0.1', '', '10.0.0.1'),
+        )
+        for remote, forwarded, expected in cases:
+            with self.subTest(remote=remote, forwarded=forwarded):
+                request = factory.get(
+                    '/', REMOTE_ADDR=remote, HTTP_X_FORWARDED_FOR=forwarded
+                )
+                self.assertEqual(ratelimit.client_ip(request), expected)
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(4):
+            ratelimit.hit('test', 4, 60, now=59)
+        self.assertTrue(ratelimit.hit('test', 4, 60, now=61))
+        self.assertEqual(ratelimit.hit('test', 4, 60, now=115), 0)
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.user, text='Первый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:post_detail', args=[self.post.id])
+
+    def test_anonymous_page_is_cached(self):
+        first = self.client.get(self.url)
+        self.assertIn('public', first['Cache-Control'])
+        self.assertIn('Cookie', first['Vary'])
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.content, first.content)
+
+    def test_content_write_purges_pages(self):
+        self.client.get(self.url)
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        self.assertContains(self.client.get(self.url), 'Исправленный пост')
+
+    def test_query_string_is_part_of_key(self):
+        self.client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('posts:index'), {'page': 2})
+        self.assertIsNotNone(response.context)
+
+    def test_logged_in_user_bypasses_cache(self):
+        self.client.get(self.url)
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertIsNotNone(response.context)
+        self.assertIn('private', response['Cache-Control'])
+
+    def is_cached(self, url):
+        return self.client.get(url).context is None
+
+    def test_new_post_appears_on_index(self):
+        index = reverse('posts:index')
+        self.client.get(index)
+        Post.objects.create(author=self.user, text='Свежий пост')
+        self.assertContains(self.client.get(index), 'Свежий пост')
+
+    def test_comment_purges_only_its_post(self):
+        index = reverse('posts:index')
+        for url in (self.url, index):
+            self.client.get(url)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Комментарий'
+        )
+        self.assertFalse(self.is_cached(self.url))
+        self.assertTrue(self.is_cached(index))
+
+    def test_group_pages_are_purged_separately(self):
+        group, other = (
+            Group.objects.create(title=slug, slug=slug, description='')
+            for slug in ('first', 'second')
+        )
+        urls = [
+            reverse('posts:group_list', args=[slug])
+            for slug in ('first', 'second')
+        ]
+        for url in urls:
+            self.client.get(url)
+        Post.objects.create(author=self.user, group=group, text='Новый пост')
+        self.assertFalse(self.is_cached(urls[0]))
+        self.assertTrue(self.is_cached(urls[1]))
+
+    def test_user_change_purges_pages(self):
+        self.client.get(self.url)
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=['last_login'])
+        self.assertTrue(self.is_cached(self.url))
+        self.user.first_name = 'Читатель'
+        self.user.save()
+        self.assertFalse(self.is_cached(self.url))
+
+    def test_trending_job_purges_trending_page(self):
+        url = reverse('posts:trending')
+        self.client.get(url)
+        self.assertTrue(self.is_cached(url))
+        follow_created(self.user.id, timezone.now().timestamp())
+        self.assertFalse(self.is_cached(url))
+
+
+class CSSPurgeTest(TestCase):
+    def test_unused_rules_are_removed(self):
+        css = (
+            '/*! лицензия */:root{--x:1}.btn,.unused{color:red}'
+            '.unused>a{color:blue}@media (min-width:1px){.unused{top:0}'
+            '.row{top:1px}}@keyframes spin{to{opacity:0}}a{color:"{}"}'
+        )
+        self.assertEqual(
+            csspurge.purge(css, {'btn', 'row'}),
+            '/*! лицензия */:root{--x:1}.btn{color:red}'
+            '@media (min-width:1px){.row{top:1px}}'
+            '@keyframes spin{to{opacity:0}}a{color:"{}"}',
+        )
+
+
+class StaticFilesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.settings = override_settings(STATIC_ROOT=cls.static_root)
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(cls.static_root, 'staticfiles.json')) as f:
+            cls.manifest = json.load(f)['paths']
+        cls.application = StaticFiles(
+            cls.fallback, cls.static_root, settings.STATIC_URL
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.static_root)
+        super().tearDownClass()
+
+    @staticmethod
+    def fallback(environ, start_response):
+        start_response('404 Not Found', [])
+        return [b'django']
+
+    def get(self, path, **headers):
+        environ = RequestFactory().get(path, **headers).environ
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        response['body'] = b''.join(self.application(environ, start_response))
+        return response
+
+    def test_hashed_stylesheet_is_purged_and_compressed(self):
+        name = self.manifest['css/bootstrap.min.css']
+        response = self.get(
+            settings.STATIC_URL + name, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertIn('immutable', response['headers']['Cache-Control'])
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        css = gzip.decompress(response['body']).decode()
+        self.assertIn('.btn-primary', css)
+        self.assertNotIn('.carousel', css)
+
+    def test_unknown_paths_reach_application(self):
+        for path in ('/static/nope.css', '/static/../manage.py', '/about/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)['body'], b'django')
+
+    def test_page_links_single_stylesheet(self):
+        response = self.client.get(reverse('about:author'))
+        self.assertContains(response, 'rel="stylesheet"', count=1)
+
+
+class MediaFilesTest(TestCase):
+    content = bytes(range(256)) * 4
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(cls.media_root, 'cache', 'ab'))
+        for name in ('cache/ab/thumb.jpg', 'image.jpg'):
+            with open(os.path.join(cls.media_root, name), 'wb') as f:
+                f.write(cls.content)
+        cls.application = StaticFiles(
+            StaticFilesTest.fallback, cls.media_root, '/media/',
+            max_age=60, immutable=THUMBNAIL_RE,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.media_root)
+        super().tearDownClass()
+
+    get = StaticFilesTest.get
+
+    def test_cache_headers(self):
+        thumbnail = self.get('/media/cache/ab/thumb.jpg')
+        self.assertIn('immutable', thumbnail['headers']['Cache-Control'])
+        self.assertEqual(thumbnail['body'], self.content)
+        image = self.get('/media/image.jpg')
+        self.assertEqual(
+            image['headers']['Cache-Control'], 'public, max-age=60'
+        )
+
+    def test_etag(self):
+        etag = self.get('/media/image.jpg')['headers']['ETag']
+        response = self.get('/media/image.jpg', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response['status'], '304 Not Modified')
+        self.assertEqual(response['body'], b'')
+
+    def test_ranges(self):
+        cases = (
+            ('bytes=0-9', '206 Partial Content', self.content[:10]),
+            ('bytes=1000-', '206 Partial Content', self.content[1000:]),
+            ('bytes=-5', '206 Partial Content', self.content[-5:]),
+            ('bytes=5000-', '416 Range Not Satisfiable', b''),
+            ('bytes=0-1,5-6', '200 OK', self.content),
+        )
+        for header, status, body in cases:
+            with self.subTest(header=header):
+                response = self.get('/media/image.jpg', HTTP_RANGE=header)
+                self.assertEqual(response['status'], status)
+                self.assertEqual(response['body'], body)
+
+
+class MinifiedHTMLTest(TestCase):
+    def test_minify_html(self):
+        source = (
+            '<div>\n    <!-- комментарий -->\n    <a>{{ x }}</a>\n\n'
+            '  <pre>  как\n  есть</pre>  <b>!</b>\n</div>\n'
+        )
+        self.assertEqual(
+            minify_html(source),
+            '<div>\n<a>{{ x }}</a> <pre>  как\n  есть</pre> <b>!</b>\n</div>',
+        )
+
+    def test_only_html_templates_are_minified(self):
+        source = 'Привет,\n    {{ name }}!\n\n<!-- не комментарий -->\n'
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for name in ('page.html', 'mail.txt'):
+            with open(os.path.join(directory, name), 'w') as template:
+                template.write(source)
+        engine = Engine(dirs=[directory], loaders=[
+            'core.loaders.FilesystemLoader'
+        ])
+        context = Context({'name': 'автор'})
+        self.assertEqual(
+            engine.get_template('mail.txt').render(context),
+            'Привет,\n    автор!\n\n<!-- не комментарий -->\n',
+        )
+        self.assertEqual(
+            engine.get_template('page.html').render(context),
+            'Привет,\nавтор!',
+        )
+
+    def test_pages_are_minified_and_compressed(self):
+        response = self.client.get(
+            reverse('about:tech'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        html = gzip.decompress(response.content).decode()
+        self.assertNotIn('\n ', html)
+        self.assertNotIn('<!--', html)
+
+    def test_event_stream_is_not_compressed(self):
+        response = self.client.get(
+            reverse('posts:index_events'), HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+        # Первое событие приходит сразу, а не при закрытии потока.
+        first = next(iter(response.streaming_content))
+        self.assertTrue(first.startswith(b'retry:'))
+        response.close()
+
+
+@override_settings(PAGINATOR_ON_EACH_SIDE=2, PAGINATOR_ON_ENDS=1)
+class PaginatorWindowTest(TestCase):
+    def window(self, number, count=100, **kwargs):
+        paginator = Paginator(range(count), 10, **kwargs)
+        return paginator.get_page(number).window
+
+    def test_window(self):
+        cases = (
+            (1, [1, 2, 3, ELLIPSIS, 10]),
+            (5, [1, 2, 3, 4, 5, 6, 7, ELLIPSIS, 10]),
+            (6, [1, ELLIPSIS, 4, 5, 6, 7, 8, 9, 10]),
+            (10, [1, ELLIPSIS, 8, 9, 10]),
+        )
+        for number, window in cases:
+            with self.subTest(number=number):
+                self.assertEqual(self.window(number), window)
+
+    def test_short_range_has_no_ellipsis(self):
+        self.assertEqual(self.window(2, count=40), [1, 2, 3, 4])
+
+    def test_given_count_skips_count_query(self):
+        with self.assertNumQueries(0):
+            paginator = Paginator(Post.objects.all(), 10, count=lambda: 95)
+            self.assertEqual(paginator.num_pages, 10)
+
+    def test_approximate_count_hides_last_pages(self):
+        self.assertEqual(
+            self.window(1, approximate=True), [1, 2, 3, ELLIPSIS]
+        )
@@ -1,8 +1,75 @@
-from django.contrib import admin
-from .models import Post, Group, Comment, Follow
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
+from core.paginator import CachedCountPaginator
+from . import moderation, revisions
+from .models import Post, Group, Comment, Follow, PostRevision
 
 
-class PostAdmin(admin.ModelAdmin):
+class CountedAdmin(admin.ModelAdmin):
+    """Список без полного COUNT(*) на каждой странице."""
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
+
+class ModerationAdmin(CountedAdmin):
+    """Массовые действия выполняются в фоне пачками (posts.moderation).
+
+    Стандартное delete_selected убрано: оно удаляет всё одной
+    транзакцией вместе с каскадом. В списке видны и скрытые объекты,
+    чтобы их можно было вернуть или удалить.
+    """
+    actions = (
+        'hide_in_background', 'restore_in_background', 'delete_in_background'
+    )
+    list_filter = ('is_deleted',)
+
+    def get_queryset(self, request):
+        queryset = self.model.all_objects.get_queryset()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def enqueue(self, request, queryset, action, group_id=None):
+        queued_job = moderation.enqueue(queryset, action, group_id)
+        self.message_user(
+            request,
+            f'Задача #{queued_job.id} поставлена в очередь, ход '
+            f'выполнения виден в списке задач.',
+        )
+
+    def delete_in_background(self, request, queryset):
+        self.enqueue(request, queryset, moderation.DELETE)
+    delete_in_background.short_description = 'Удалить выбранные (в фоне)'
+    delete_in_background.allowed_permissions = ('delete',)
+
+    def hide_in_background(self, request, queryset):
+        self.enqueue(request, queryset, moderation.HIDE)
+    hide_in_background.short_description = 'Скрыть выбранные (в фоне)'
+    hide_in_background.allowed_permissions = ('delete',)
+
+    def restore_in_background(self, request, queryset):
+        self.enqueue(request, queryset, moderation.RESTORE)
+    restore_in_background.short_description = (
+        'Вернуть скрытые (в фоне)'
+    )
+    restore_in_background.allowed_permissions = ('delete',)
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(), required=False, label='Сообщество'
+    )
+
+
+class PostAdmin(ModerationAdmin):
     list_display = (
         'pk',
         'text',
@@ -10,36 +77,108 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'group',
     )
-    list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    # Группа меняется в форме поста: в списке выпадающий список всех
+    # групп строился бы в каждой строке.
+    autocomplete_fields = ('group',)
+    raw_id_fields = ('author',)
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    # DateFieldListFilter фильтрует диапазоном pub_date по индексу
+    # post_pub_date_idx и, в отличие от date_hierarchy, не перебирает
+    # даты таблицы через DISTINCT.
+    list_filter = ('pub_date', 'is_deleted')
     empty_value_display = '-пусто-'
+    action_form = PostActionForm
+    actions = (
+        'hide_in_background',
+        'restore_in_background',
+        'delete_in_background',
+        'move_to_group',
+        'remove_from_group',
+    )
+
+    def move_to_group(self, request, queryset):
+        # Поле формы необязательное: форма общая для всех действий.
+        try:
+            group = self.action_form.base_fields['group'].clean(
+                request.POST.get('group')
+            )
+        except ValidationError:
+            group = None
+        if group is None:
+            self.message_user(
+                request, 'Выберите сообщество.', messages.ERROR
+            )
+            return
+        self.enqueue(request, queryset, moderation.MOVE, group.id)
+    move_to_group.short_description = 'Перенести в сообщество (в фоне)'
+    move_to_group.allowed_permissions = ('change',)
+
+    def remove_from_group(self, request, queryset):
+        self.enqueue(request, queryset, moderation.MOVE)
+    remove_from_group.short_description = (
+        'Убрать из сообщества (в фоне)'
+    )
+    remove_from_group.allowed_permissions = ('change',)
 
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'slug', 'description')
     list_editable = ('slug',)
     list_display_links = ('title',)
+    search_fields = ('title', 'slug')
     empty_value_display = '-пусто-'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ModerationAdmin):
     list_display = (
         'post',
         'author',
         'text',
         'created',
     )
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post', 'author')
 
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(CountedAdmin):
     list_display = (
         'user',
         'author',
     )
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+
+
+class PostRevisionAdmin(CountedAdmin):
+    list_display = (
+        'post',
+        'number',
+        'editor',
+        'is_snapshot',
+        'created',
+    )
+    list_select_related = ('post', 'editor')
+    raw_id_fields = ('post', 'editor')
+    readonly_fields = ('text',)
+
+    def text(self, obj):
+        return revisions.text_at(obj.post_id, obj.number)
+    text.short_description = 'Текст версии'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Без одной версии не восстановить все следующие за ней.
+        return False
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(PostRevision, PostRevisionAdmin)
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+POST_FIELDS = (
+    'id', 'created', 'text', 'pub_date', 'author_id', 'group_id', 'image',
+)
+COMMENT_FIELDS = (
+    'id', 'created', 'post_id', 'author_id', 'text', 'is_deleted',
+)
+
+
+def archive_horizon():
+    return timezone.now() - timedelta(days=settings.POSTS_ARCHIVE_AFTER_DAYS)
+
+
+def archive_batch(post_ids):
+    """Переносит посты и их комментарии в архивные таблицы."""
+    with transaction.atomic():
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**values) for values in
+            Post.objects.filter(id__in=post_ids).values(*POST_FIELDS)
+        )
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(**values) for values in
+            Comment.all_objects.filter(post_id__in=post_ids).values(
+                *COMMENT_FIELDS
+            )
+        )
+        Post.objects.filter(id__in=post_ids).delete()
+
+
+def archive_posts(before=None, batch_size=None):
+    """Архивирует посты старше before пачками, возвращает их число."""
+    before = before or archive_horizon()
+    batch_size = batch_size or settings.POSTS_ARCHIVE_BATCH_SIZE
+    # У архивных постов нет истории правок: посты с ней остаются в
+    # основной таблице, иначе каскад удалил бы версии.
+    old_posts = Post.objects.filter(
+        pub_date__lt=before, revisions__isnull=True
+    ).order_by('pub_date')
+    archived = 0
+    while True:
+        post_ids = list(old_posts.values_list('id', flat=True)[:batch_size])
+        if not post_ids:
+            return archived
+        archive_batch(post_ids)
+        archived += len(post_ids)
+
+
+def get_post_or_archived(post_id):
+    """Пост из основной таблицы или из архива, иначе None."""
+    post = Post.objects.select_related('author', 'group').filter(
+        id=post_id
+    ).first()
+    if post is None:
+        post = ArchivedPost.objects.select_related('author', 'group').filter(
+            id=post_id
+        ).first()
+    return post
+
+
+class ArchiveChain:
+    """Свежие посты, за которыми следуют архивные, для Paginator.
+
+    Архивные посты всегда старше свежих, поэтому склейка двух выборок
+    сохраняет сортировку по дате публикации.
+    """
+
+    def __init__(self, posts, archived_posts, posts_count=None,
+                 archived_count=None):
+        self.posts = posts
+        self.archived_posts = archived_posts
+        # Известные заранее числа заменяют cached_property ниже.
+        if posts_count is not None:
+            self.posts_count = posts_count
+        if archived_count is not None:
+            self.archived_count = archived_count
+
+    @cached_property
+    def posts_count(self):
+        return self.posts.count()
+
+    @cached_property
+    def archived_count(self):
+        return self.archived_posts.count()
+
+    def count(self):
+        return self.posts_count + self.archived_count
+
+    def __getitem__(self, index):
+        start, stop = index.start or 0, index.stop
+        result = []
+        if start < self.posts_count:
+            result += list(self.posts[start:stop])
+        if stop > self.posts_count:
+            result += list(self.archived_posts[
+                max(start - self.posts_count, 0):stop - self.posts_count
+            ])
+        return result
@@ -0,0 +1,25 @@
+"""Имена счётчиков постов в core.counts и их сброс при изменениях."""
+from core import counts
+
+ALL_POSTS = 'posts'
+
+
+def author_posts(author_id):
+    return f'posts:author:{author_id}'
+
+
+def author_archived_posts(author_id):
+    return f'posts:author:{author_id}:archived'
+
+
+def follow_posts(user_id):
+    return f'posts:follow:{user_id}'
+
+
+def invalidate_post(post):
+    # Удаление поста может означать перенос в архив.
+    counts.invalidate(
+        ALL_POSTS,
+        author_posts(post.author_id),
+        author_archived_posts(post.author_id),
+    )
@@ -0,0 +1,50 @@
+"""Курсоры для бесконечной прокрутки лент.
+
+Курсор -- «дата публикации в микросекундах-id» последнего показанного
+поста. Следующая порция выбирается условием
+(pub_date, id) < курсора по индексам лент, без OFFSET и COUNT, поэтому
+стоит одинаково на любой глубине ленты.
+"""
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+# Больше BIGINT базы id быть не может, а sqlite на таком числе падает.
+MAX_ID = 2 ** 63 - 1
+
+
+def is_id(value):
+    """Похожа ли строка из запроса на id поста."""
+    return value.isdigit() and 0 < int(value) <= MAX_ID
+
+
+def encode_cursor(post):
+    return f'{(post.pub_date - EPOCH) // MICROSECOND}-{post.pk}'
+
+
+def decode_cursor(cursor):
+    """(pub_date, id) или None; ValueError для испорченного курсора."""
+    if not cursor:
+        return None
+    microseconds, post_id = cursor.split('-')
+    post_id = int(post_id)
+    if not 0 < post_id <= MAX_ID:
+        raise ValueError(cursor)
+    try:
+        return EPOCH + int(microseconds) * MICROSECOND, post_id
+    except OverflowError as error:
+        # Дата за пределами datetime.
+        raise ValueError(cursor) from error
+
+
+def posts_before(posts, cursor, count):
+    posts = posts.order_by('-pub_date', '-id')
+    if cursor is not None:
+        pub_date, post_id = cursor
+        posts = posts.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=post_id)
+        )
+    return list(posts[:count])
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .hydration import hydrate_posts
+from .models import Post
+
+GROUP_FEED_KEY = 'group_feed:{}'
+
+
+def group_feed_size():
+    return settings.POSTS_PER_PAGE * settings.GROUP_FEED_PAGES
+
+
+def build_group_feed(group_id):
+    posts = Post.objects.filter(group_id=group_id)
+    feed = {
+        'ids': list(posts.values_list('id', flat=True)[:group_feed_size()]),
+        'count': posts.count(),
+    }
+    cache.set(
+        GROUP_FEED_KEY.format(group_id), feed, settings.GROUP_FEED_TIMEOUT
+    )
+    return feed
+
+
+def get_group_feed(group_id):
+    """Id последних постов группы и общее число её постов."""
+    feed = cache.get(GROUP_FEED_KEY.format(group_id))
+    if feed is None:
+        feed = build_group_feed(group_id)
+    return feed
+
+
+def push_to_group_feed(post):
+    """Добавляет новый пост в начало списка, не перечитывая группу."""
+    key = GROUP_FEED_KEY.format(post.group_id)
+    feed = cache.get(key)
+    if feed is None:
+        return
+    feed['ids'] = [post.id] + feed['ids'][:group_feed_size() - 1]
+    feed['count'] += 1
+    cache.set(key, feed, settings.GROUP_FEED_TIMEOUT)
+
+
+def invalidate_group_feed(group_id):
+    cache.delete(GROUP_FEED_KEY.format(group_id))
+
+
+class GroupFeed:
+    """Лента группы для Paginator.
+
+    Первые GROUP_FEED_PAGES страниц собираются из закэшированного списка
+    id через hydrate_posts, дальние страницы читаются из базы.
+    """
+
+    def __init__(self, group):
+        self.group = group
+        self.feed = get_group_feed(group.id)
+
+    def count(self):
+        return self.feed['count']
+
+    def posts(self):
+        return self.group.posts.select_related('author', 'group')
+
+    def __getitem__(self, index):
+        ids = self.feed['ids']
+        if index.stop > len(ids) and len(ids) < self.feed['count']:
+            return list(self.posts()[index])
+        page_ids = ids[index]
+        posts = hydrate_posts(page_ids)
+        if len(posts) != len(page_ids):
+            # Список устарел (пост удалён в обход сигналов).
+            invalidate_group_feed(self.group.id)
+            return list(self.posts()[index])
+        return posts
@@ -0,0 +1,71 @@
+"""Граф подписок: множества id в кэше в виде отсортированных массивов.
+
+following_ids(user) -- на кого подписан пользователь,
+follower_ids(author) -- кто подписан на автора. Массивы строятся при
+первом обращении и сбрасываются сигналами при изменении Follow.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+FOLLOWING_KEY = 'follow_graph:following:{}'
+FOLLOWERS_KEY = 'follow_graph:followers:{}'
+
+
+def _get_ids(key, follows, field):
+    ids = cache.get(key)
+    if ids is None:
+        ids = array('l', sorted(set(
+            follows.values_list(field, flat=True).order_by()
+        )))
+        cache.set(key, ids, settings.FOLLOW_GRAPH_TIMEOUT)
+    return ids
+
+
+def _contains(ids, value):
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def following_ids(user_id):
+    return _get_ids(
+        FOLLOWING_KEY.format(user_id),
+        Follow.objects.filter(user_id=user_id),
+        'author_id',
+    )
+
+
+def follower_ids(author_id):
+    return _get_ids(
+        FOLLOWERS_KEY.format(author_id),
+        Follow.objects.filter(author_id=author_id),
+        'user_id',
+    )
+
+
+def is_following(user_id, author_id):
+    return _contains(following_ids(user_id), author_id)
+
+
+def following_among(user_id, author_ids):
+    """Те из author_ids, на кого подписан пользователь."""
+    ids = following_ids(user_id)
+    return {author_id for author_id in author_ids if _contains(ids, author_id)}
+
+
+def common_following(user_id, other_user_id):
+    """Авторы, на которых подписаны оба пользователя, по возрастанию id."""
+    first, second = following_ids(user_id), following_ids(other_user_id)
+    if len(first) > len(second):
+        first, second = second, first
+    return [author_id for author_id in first if _contains(second, author_id)]
+
+
+def invalidate(user_id, author_id):
+    cache.delete_many([
+        FOLLOWING_KEY.format(user_id), FOLLOWERS_KEY.format(author_id)
+    ])
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Group, Post, User
+
+# Версия в ключе меняется вместе с набором полей serialize_post.
+POST_KEY = 'post:v2:{}'
+
+
+def serialize_post(post):
+    author = post.author
+    group = post.group
+    return {
+        'id': post.id,
+        'text': post.text,
+        'pub_date': post.pub_date,
+        'created': post.created,
+        'image': post.image.name,
+        'author': {
+            'id': author.id,
+            'username': author.username,
+            'first_name': author.first_name,
+            'last_name': author.last_name,
+        },
+        'group': group and {
+            'id': group.id,
+            'title': group.title,
+            'slug': group.slug,
+            'description': group.description,
+        },
+    }
+
+
+def deserialize_post(data):
+    data = dict(data)
+    author = User(**data.pop('author'))
+    group = data.pop('group')
+    post = Post(**data, author=author)
+    post.group = group and Group(**group)
+    for instance in (post, author, post.group):
+        if instance is not None:
+            instance._state.adding = False
+            instance._state.db = Post.objects.db
+    return post
+
+
+def hydrate_posts(post_ids):
+    """Посты с авторами и группами в порядке post_ids.
+
+    Сначала посты ищутся в кэше, недостающие читаются одним запросом
+    in_bulk и кладутся в кэш. Несуществующие id пропускаются.
+    """
+    keys = {POST_KEY.format(post_id): post_id for post_id in post_ids}
+    posts = {
+        keys[key]: deserialize_post(data)
+        for key, data in cache.get_many(keys).items()
+    }
+    missing = [post_id for post_id in post_ids if post_id not in posts]
+    if missing:
+        fetched = Post.objects.select_related('author', 'group').in_bulk(
+            missing
+        )
+        cache.set_many(
+            {
+                POST_KEY.format(post_id): serialize_post(post)
+                for post_id, post in fetched.items()
+            },
+            settings.POST_CACHE_TIMEOUT,
+        )
+        posts.update(fetched)
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+def invalidate_post(post_id):
+    cache.delete(POST_KEY.format(post_id))
+
+
+def invalidate_posts(post_ids):
+    cache.delete_many([POST_KEY.format(post_id) for post_id in post_ids])
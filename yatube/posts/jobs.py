@@ -0,0 +1,31 @@
+"""Обработчики отложенных задач постов (см. core.jobs)."""
+from core import pagecache
+from core.jobs import job
+
+from . import moderation, pages, trending
+from .models import Comment
+
+
+@job('posts.comment_created')
+def comment_created(comment_id, at):
+    comment = Comment.objects.select_related('post').filter(
+        id=comment_id, post__is_deleted=False
+    ).first()
+    if comment is not None:
+        trending.record_comment(comment.post, at)
+        tags = [pages.TRENDING]
+        if comment.post.group_id:
+            # Популярные посты группы показаны на её странице.
+            tags.append(pages.group_tag(comment.post.group_id))
+        pagecache.purge(*tags)
+
+
+@job('posts.follow_created')
+def follow_created(author_id, at):
+    trending.record_follow(author_id, at)
+    pagecache.purge(pages.TRENDING)
+
+
+@job('posts.moderate')
+def moderate(model, action, ids, group_id=None):
+    moderation.moderate(model, action, ids, group_id)
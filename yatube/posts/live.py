@@ -0,0 +1,127 @@
+"""Живые ленты: id новых постов приходят на страницу по Server-Sent Events.
+
+Новый пост публикуется (core.pubsub) в общий канал, канал автора и канал
+группы. Страница ленты держит поток событий и по каждому событию
+запрашивает только карточки новых постов, а не всю страницу.
+
+При переподключении браузер присылает Last-Event-ID -- id самого нового
+поста, который он видел. Пропущенные посты берутся из базы, поэтому
+события не теряются даже с брокером в памяти одного процесса.
+
+Открытых потоков в процессе не больше LIVE_MAX_STREAMS (open_stream), а
+соединение с базой поток отдаёт сразу после первого запроса.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from core import pubsub
+
+POSTS_CHANNEL = 'posts'
+
+_streams_lock = threading.Lock()
+_open_streams = 0
+
+
+def group_channel(group_id):
+    return f'posts:group:{group_id}'
+
+
+def author_channel(author_id):
+    return f'posts:author:{author_id}'
+
+
+def publish_post(post):
+    channels = [POSTS_CHANNEL, author_channel(post.author_id)]
+    if post.group_id:
+        channels.append(group_channel(post.group_id))
+    for channel in channels:
+        pubsub.publish(channel, post.id)
+
+
+def event(post_ids):
+    post_ids = sorted(set(post_ids), reverse=True)
+    data = ','.join(str(post_id) for post_id in post_ids)
+    return f'id: {post_ids[0]}\nevent: posts\ndata: {data}\n\n'
+
+
+def acquire_stream():
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= settings.LIVE_MAX_STREAMS:
+            return False
+        _open_streams += 1
+        return True
+
+
+def release_stream():
+    global _open_streams
+    with _streams_lock:
+        _open_streams -= 1
+
+
+class Stream:
+    """Итератор потока событий, который освобождает место при закрытии.
+
+    StreamingHttpResponse вызывает close() и тогда, когда поток так и не
+    начал выполняться.
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def __iter__(self):
+        return self.events
+
+    def close(self):
+        # Ответ может быть закрыт дважды: сервером и обёрткой над ним.
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.events.close()
+        finally:
+            release_stream()
+
+
+def open_stream(channels, posts, after=None):
+    """Stream для ответа или None, если открыто LIVE_MAX_STREAMS потоков."""
+    if not acquire_stream():
+        return None
+    return Stream(event_stream(channels, posts, after))
+
+
+def release_connections():
+    # Поток живёт минутами, соединение ему больше не нужно. Внутри
+    # транзакции (ATOMIC_REQUESTS, тесты) закрывать его нельзя.
+    for connection in connections.all():
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def event_stream(channels, posts, after=None):
+    """Текст text/event-stream для ленты posts.
+
+    Поток закрывается через LIVE_STREAM_TIMEOUT секунд, браузер
+    переподключается сам: так поток не занимает поток сервера надолго.
+    """
+    subscription = pubsub.subscribe(channels)
+    deadline = time.monotonic() + settings.LIVE_STREAM_TIMEOUT
+    try:
+        yield f'retry: {settings.LIVE_RETRY_MS}\n\n'
+        if after is not None:
+            missed = list(
+                posts.filter(id__gt=after).order_by('-id')
+                .values_list('id', flat=True)[:settings.POSTS_PER_PAGE]
+            )
+            if missed:
+                yield event(missed)
+        release_connections()
+        while time.monotonic() < deadline:
+            post_ids = subscription.get(settings.LIVE_HEARTBEAT)
+            yield event(post_ids) if post_ids else ':\n\n'
+    finally:
+        subscription.close()
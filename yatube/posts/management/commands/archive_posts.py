@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import archive_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше POSTS_ARCHIVE_AFTER_DAYS вместе с '
+        'комментариями в архивные таблицы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POSTS_ARCHIVE_AFTER_DAYS
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.POSTS_ARCHIVE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        archived = archive_posts(before, options['batch_size'])
+        self.stdout.write(f'Перенесено в архив постов: {archived}')
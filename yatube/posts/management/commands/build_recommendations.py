@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import build_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации «кого почитать» для всех.'
+
+    def handle(self, *args, **options):
+        count = build_recommendations()
+        self.stdout.write(f'Сохранено рекомендаций: {count}')
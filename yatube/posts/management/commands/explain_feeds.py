@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.models import Follow, Group, Post
+
+
+class Command(BaseCommand):
+    help = 'Печатает планы запросов первой страницы каждой ленты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='Выполнить запросы (EXPLAIN ANALYZE, только PostgreSQL).'
+        )
+
+    def feeds(self):
+        yield 'index', Post.objects.all()
+        group = Group.objects.first()
+        if group is not None:
+            yield 'group_posts', group.posts.all()
+        post = Post.objects.first()
+        if post is not None:
+            yield 'profile', Post.objects.filter(author=post.author_id)
+        follow = Follow.objects.first()
+        if follow is not None:
+            yield 'follow_index', Post.objects.filter(
+                author__following__user=follow.user_id
+            )
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze']:
+            explain_options['analyze'] = True
+        for name, queryset in self.feeds():
+            page = queryset[:settings.POSTS_PER_PAGE]
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(page.explain(**explain_options))
@@ -0,0 +1,31 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Выгружает все посты в формате JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Файл (по умолчанию stdout).')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.values(
+            'id', 'text', 'pub_date', 'author__username', 'group__slug',
+            'image',
+        ).order_by('id')
+        output = self.stdout
+        if options['output']:
+            output = open(options['output'], 'w', encoding='utf-8')
+        try:
+            # Серверный курсор в PostgreSQL: память не растёт с таблицей.
+            chunk_size = settings.ITERATOR_CHUNK_SIZE
+            for post in posts.iterator(chunk_size=chunk_size):
+                post['pub_date'] = post['pub_date'].isoformat()
+                output.write(json.dumps(post, ensure_ascii=False) + '\n')
+        finally:
+            if output is not self.stdout:
+                output.close()
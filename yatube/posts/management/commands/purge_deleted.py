@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import moderation
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Физически удаляет скрытые (is_deleted) комментарии и посты '
+        'небольшими пачками, каждую в своей транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.MODERATION_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        targets = (
+            ('comment', Comment, 'комментариев'),
+            ('post', Post, 'постов'),
+        )
+        for name, model, label in targets:
+            ids = list(
+                model.all_objects.filter(is_deleted=True)
+                .order_by('id').values_list('id', flat=True)
+            )
+            purged = moderation.moderate(
+                name, moderation.DELETE, ids,
+                chunk_size=options['batch_size'],
+            )
+            self.stdout.write(f'Удалено {label}: {purged}')
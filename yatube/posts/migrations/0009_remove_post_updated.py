@@ -0,0 +1,17 @@
+# Generated by Django 2.2.19 on 2026-10-19 11:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_feed_order_by_id'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='post',
+            name='updated',
+        ),
+    ]
@@ -1,11 +1,14 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from core.models import CreatedModel
+from core.models import CreatedModel, SoftDeleteModel
 
 User = get_user_model()
 
 
-class Post(CreatedModel):
+NOT_DELETED = models.Q(is_deleted=False)
+
+
+class Post(CreatedModel, SoftDeleteModel):
     text = models.TextField(max_length=500, verbose_name='Текст')
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name='Дата публикации')
@@ -24,7 +27,22 @@ class Post(CreatedModel):
         blank=True)
 
     class Meta:
-        ordering = ("-pub_date",)
+        # id различает посты с одной датой: страницы и порции прокрутки
+        # (posts.cursors) идут в одном и том же полном порядке.
+        ordering = ('-pub_date', '-id')
+        # Ленты (index, group_posts, profile) сортируют по дате публикации.
+        # Индексы частичные: удалённые посты в них не попадают.
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_pub_date_idx',
+                         condition=NOT_DELETED),
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_pub_date_idx',
+                         condition=NOT_DELETED),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_pub_date_idx',
+                         condition=NOT_DELETED),
+        ]
 
     def __str__(self) -> str:
         return self.text
@@ -42,7 +60,7 @@ class Group(models.Model):
         return self.title
 
 
-class Comment(CreatedModel):
+class Comment(CreatedModel, SoftDeleteModel):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -60,6 +78,11 @@ class Comment(CreatedModel):
 
     class Meta:
         ordering = ("-created",)
+        indexes = [
+            models.Index(fields=['post', '-created'],
+                         name='comment_post_created_idx',
+                         condition=NOT_DELETED),
+        ]
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
 
@@ -85,3 +108,127 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user} подписался на {self.author}'
+
+
+class PostRevision(CreatedModel):
+    """Версия текста поста после правки (см. posts.revisions).
+
+    Нулевая версия -- текст до первой правки. Она и каждая
+    REVISION_SNAPSHOT_EVERY-я версия хранят текст целиком, остальные --
+    разницу с предыдущей версией.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+        verbose_name='Пост')
+    number = models.PositiveIntegerField('Номер версии')
+    editor = models.ForeignKey(
+        User,
+        blank=True,
+        null=True, on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name='Автор правки')
+    is_snapshot = models.BooleanField('Полный текст', default=False)
+    data = models.TextField('Текст или разница (JSON)')
+
+    class Meta:
+        ordering = ('post', 'number')
+        unique_together = ('post', 'number')
+        verbose_name = 'Версия поста'
+        verbose_name_plural = 'Версии постов'
+
+    def __str__(self):
+        return f'{self.post_id} v{self.number}'
+
+
+class ArchivedPost(models.Model):
+    """Пост, перенесённый в архив командой archive_posts.
+
+    Сохраняет id исходного поста, поэтому ссылки на него не ломаются.
+    """
+    is_archived = True
+
+    id = models.IntegerField(primary_key=True)
+    created = models.DateTimeField('Дата создания')
+    text = models.TextField(verbose_name='Текст')
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name='archived_posts', verbose_name='Автор')
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True, on_delete=models.SET_NULL,
+        verbose_name='Сообщество',
+        related_name='archived_posts')
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True)
+
+    class Meta:
+        ordering = ('-pub_date', '-id')
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+        indexes = [
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='archived_author_pub_date_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class ArchivedComment(SoftDeleteModel):
+    """Комментарий архивного поста; скрытые модератором остаются скрытыми."""
+    id = models.IntegerField(primary_key=True)
+    created = models.DateTimeField('Дата создания')
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name="comments",
+        verbose_name="Пост",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_comments",
+        verbose_name="Автор комментария",
+    )
+    text = models.TextField('Текст')
+
+    class Meta:
+        ordering = ("-created",)
+        verbose_name = "Архивный комментарий"
+        verbose_name_plural = "Архивные комментарии"
+
+    def __str__(self) -> str:
+        return self.text[:15]
+
+
+class FollowRecommendation(models.Model):
+    """Кого почитать: заранее посчитано командой build_recommendations."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='Пользователь')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рекомендуемый автор')
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        ordering = ('-score',)
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        indexes = [
+            models.Index(fields=['user', '-score'],
+                         name='recommendation_user_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
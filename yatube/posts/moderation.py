@@ -0,0 +1,94 @@
+"""Массовые действия модерации из админки.
+
+Действие ставит задачу posts.moderate (core.jobs), воркер выполняет её
+пачками по MODERATION_CHUNK_SIZE объектов, каждую в своей транзакции:
+удаление автора с тысячами постов и комментариев не держит блокировку
+SQLite всё время. Кэши постов сбрасываются один раз в конце
+(signals.batch_invalidation), ход выполнения виден в списке задач.
+
+HIDE только помечает объекты удалёнными (SoftDeleteModel), RESTORE
+снимает отметку, DELETE удаляет строки; им же команда purge_deleted
+дочищает скрытое.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from core import jobs
+
+from .models import Comment, Post
+from .signals import batch_invalidation
+
+DELETE = 'delete'
+HIDE = 'hide'
+MOVE = 'move'
+RESTORE = 'restore'
+# Значение is_deleted для действий со скрытием.
+IS_DELETED = {HIDE: True, RESTORE: False}
+MODELS = {'post': Post, 'comment': Comment}
+
+
+def enqueue(queryset, action, group_id=None):
+    return jobs.enqueue(
+        'posts.moderate',
+        model=queryset.model._meta.model_name,
+        action=action,
+        ids=list(queryset.order_by('id').values_list('id', flat=True)),
+        group_id=group_id,
+    )
+
+
+def chunks(ids, size):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def delete_comments(post_ids, size):
+    # Комментарии удаляются заранее своими пачками, иначе каскад
+    # удалит их все в транзакции поста.
+    comments = Comment.all_objects.filter(post_id__in=post_ids)
+    while True:
+        comment_ids = list(comments.values_list('id', flat=True)[:size])
+        if not comment_ids:
+            return
+        with transaction.atomic():
+            Comment.all_objects.filter(id__in=comment_ids).delete()
+
+
+def update_posts(post_ids, pending, *group_ids, **values):
+    # update() не вызывает сигналы, поэтому кэши отмечаются здесь.
+    posts = Post.all_objects.filter(id__in=post_ids)
+    for post in posts.only('id', 'author_id', 'group_id'):
+        pending.add_post(post, *group_ids)
+    posts.update(**values)
+
+
+def apply(model, action, ids, pending, group_id):
+    if action == DELETE:
+        model.all_objects.filter(id__in=ids).delete()
+    elif action in IS_DELETED and model is Post:
+        update_posts(ids, pending, is_deleted=IS_DELETED[action])
+    elif action in IS_DELETED:
+        # update() не вызывает сигналы: страницы постов с этими
+        # комментариями сбрасываются в конце вместе с остальными.
+        comments = model.all_objects.filter(id__in=ids)
+        pending.post_ids.update(comments.values_list('post_id', flat=True))
+        comments.update(is_deleted=IS_DELETED[action])
+    elif action == MOVE:
+        update_posts(ids, pending, group_id, group_id=group_id)
+    else:
+        raise ValueError(action)
+
+
+def moderate(model, action, ids, group_id=None, chunk_size=None):
+    model = MODELS[model]
+    chunk_size = chunk_size or settings.MODERATION_CHUNK_SIZE
+    done = 0
+    with batch_invalidation() as pending:
+        for chunk in chunks(ids, chunk_size):
+            if action == DELETE and model is Post:
+                delete_comments(chunk, chunk_size)
+            with transaction.atomic():
+                apply(model, action, chunk, pending, group_id)
+            done += len(chunk)
+            jobs.report_progress(done, len(ids))
+    return done
@@ -0,0 +1,29 @@
+"""Теги страниц постов в кэше core.pagecache и их сброс."""
+from core import pagecache
+
+INDEX = 'index'
+TRENDING = 'trending'
+
+
+def post_tag(post_id):
+    return f'post:{post_id}'
+
+
+def author_tag(author_id):
+    return f'author:{author_id}'
+
+
+def group_tag(group_id):
+    return f'group:{group_id}'
+
+
+def purge_posts(post_ids, author_ids, group_ids):
+    # Пост виден на главной, в популярном, на своей странице, в профиле
+    # автора (и в счётчике постов на страницах его постов) и в группе.
+    pagecache.purge(
+        INDEX,
+        TRENDING,
+        *map(post_tag, post_ids),
+        *map(author_tag, author_ids),
+        *map(group_tag, group_ids),
+    )
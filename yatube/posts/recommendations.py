@@ -0,0 +1,106 @@
+"""Рекомендации «кого почитать».
+
+Считаются пакетно командой build_recommendations на разреженных
+матрицах (словарь строк {столбец: значение}):
+
+    F -- подписки, пользователь x автор;
+    C -- комментарии, пользователь x пост;
+    S = F·F + w·C·Cᵀ -- друзья друзей и те, кто комментирует те же посты.
+
+Для каждого пользователя сохраняются RECOMMENDATIONS_COUNT лучших
+авторов, на которых он ещё не подписан. На странице остаётся один
+запрос к FollowRecommendation.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from . import follow_graph
+from .models import Comment, Follow, FollowRecommendation
+
+
+def sparse_matrix(pairs):
+    matrix = defaultdict(Counter)
+    for row, column in pairs:
+        matrix[row][column] += 1
+    return matrix
+
+
+def transpose(matrix):
+    result = defaultdict(Counter)
+    for row, columns in matrix.items():
+        for column, value in columns.items():
+            result[column][row] = value
+    return result
+
+
+def multiply(left, right):
+    result = defaultdict(Counter)
+    for row, columns in left.items():
+        result_row = result[row]
+        for column, value in columns.items():
+            for right_column, right_value in right.get(column, {}).items():
+                result_row[right_column] += value * right_value
+    return result
+
+
+def compute_scores(follows, comments, comment_weight):
+    """Оценки кандидатов: {пользователь: Counter({автор: оценка})}."""
+    following = sparse_matrix(follows)
+    commented = sparse_matrix(comments)
+    scores = multiply(following, following)
+    co_commenters = multiply(commented, transpose(commented))
+    for user_id, row in co_commenters.items():
+        for other_id, value in row.items():
+            scores[user_id][other_id] += comment_weight * value
+    for user_id, row in scores.items():
+        row.pop(user_id, None)
+        for author_id in following.get(user_id, ()):
+            row.pop(author_id, None)
+    return scores
+
+
+def top_recommendations(scores, count):
+    for user_id, row in scores.items():
+        for author_id, score in row.most_common(count):
+            yield FollowRecommendation(
+                user_id=user_id, author_id=author_id, score=score
+            )
+
+
+def build_recommendations():
+    """Пересчитывает таблицу рекомендаций целиком, возвращает число строк."""
+    scores = compute_scores(
+        Follow.objects.values_list('user_id', 'author_id').iterator(),
+        Comment.objects.filter(post__is_deleted=False).values_list(
+            'author_id', 'post_id'
+        ).iterator(),
+        settings.RECOMMENDATIONS_COMMENT_WEIGHT,
+    )
+    recommendations = list(
+        top_recommendations(scores, settings.RECOMMENDATIONS_COUNT)
+    )
+    with transaction.atomic():
+        FollowRecommendation.objects.all().delete()
+        FollowRecommendation.objects.bulk_create(
+            recommendations, batch_size=settings.ITERATOR_CHUNK_SIZE
+        )
+    return len(recommendations)
+
+
+def recommendations_for(user):
+    """Готовые рекомендации без тех, на кого уже подписались."""
+    if not user.is_authenticated:
+        return []
+    recommendations = list(
+        user.recommendations.select_related('author')[
+            :settings.RECOMMENDATIONS_COUNT
+        ]
+    )
+    if not recommendations:
+        return recommendations
+    followed = follow_graph.following_among(
+        user.id, [item.author_id for item in recommendations]
+    )
+    return [item for item in recommendations if item.author_id not in followed]
@@ -0,0 +1,109 @@
+"""История правок текста постов (модель PostRevision).
+
+Разница между версиями -- список операций над предыдущим текстом
+(make_delta): положительное число -- скопировать столько символов,
+отрицательное -- пропустить столько, строка -- вставить её. Чтобы
+восстановить версию, берётся ближайший снизу полный текст и к нему
+применяется не больше REVISION_SNAPSHOT_EVERY разниц -- одним запросом.
+"""
+import json
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Subquery
+
+from .models import Post, PostRevision
+
+
+def make_delta(old, new):
+    delta = []
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append(i2 - i1)
+            continue
+        if i2 > i1:
+            delta.append(i1 - i2)
+        if j2 > j1:
+            delta.append(new[j1:j2])
+    return delta
+
+
+def apply_delta(old, delta):
+    parts, position = [], 0
+    for operation in delta:
+        if isinstance(operation, str):
+            parts.append(operation)
+        elif operation > 0:
+            parts.append(old[position:position + operation])
+            position += operation
+        else:
+            position -= operation
+    return ''.join(parts)
+
+
+def apply_revision(text, revision):
+    data = json.loads(revision.data)
+    return data if revision.is_snapshot else apply_delta(text, data)
+
+
+def record_edit(post, old_text, editor=None):
+    """Сохраняет версию после правки поста, если текст изменился.
+
+    Строка поста блокируется до конца транзакции: параллельные правки
+    получают номера по очереди, а разница считается от текста последней
+    версии -- old_text мог быть прочитан до чужой правки.
+    """
+    if post.text == old_text:
+        return None
+    with transaction.atomic():
+        Post.objects.select_for_update().get(pk=post.pk)
+        last = post.revisions.order_by('-number').first()
+        if last is None:
+            last = PostRevision.objects.create(
+                post=post, number=0, editor=post.author, is_snapshot=True,
+                data=json.dumps(old_text, ensure_ascii=False),
+            )
+        else:
+            old_text = text_at(post.id, last.number)
+        if post.text == old_text:
+            return None
+        number = last.number + 1
+        is_snapshot = number % settings.REVISION_SNAPSHOT_EVERY == 0
+        return PostRevision.objects.create(
+            post=post,
+            number=number,
+            editor=editor,
+            is_snapshot=is_snapshot,
+            data=json.dumps(
+                post.text if is_snapshot else make_delta(old_text, post.text),
+                ensure_ascii=False,
+            ),
+        )
+
+
+def text_at(post_id, number):
+    """Текст поста в версии number или None, если её нет."""
+    revisions = PostRevision.objects.filter(
+        post_id=post_id, number__lte=number
+    )
+    snapshot = revisions.filter(is_snapshot=True).order_by('-number')
+    text = last = None
+    for revision in revisions.filter(
+        number__gte=Subquery(snapshot.values('number')[:1])
+    ).order_by('number'):
+        text = apply_revision(text, revision)
+        last = revision.number
+    return text if last == number else None
+
+
+def history(post_id):
+    """[(версия, текст)] по всем правкам поста, за один проход."""
+    result, text = [], None
+    for revision in PostRevision.objects.filter(
+        post_id=post_id
+    ).select_related('editor').order_by('number'):
+        text = apply_revision(text, revision)
+        result.append((revision, text))
+    return result
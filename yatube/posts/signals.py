@@ -0,0 +1,189 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core import counts as core_counts, jobs, pagecache
+
+from . import counts, feeds, follow_graph, hydration, live, pages, trending
+from .models import Comment, Follow, Group, Post, User
+
+_batch = threading.local()
+
+
+class Invalidation:
+    """Кэши постов, которые сбросятся по окончании пакетной операции."""
+
+    def __init__(self):
+        self.post_ids = set()
+        self.group_ids = set()
+        self.author_ids = set()
+
+    def add_post(self, post, *group_ids):
+        self.post_ids.add(post.id)
+        self.author_ids.add(post.author_id)
+        group_ids += (post.group_id,)
+        self.group_ids.update(group_id for group_id in group_ids if group_id)
+
+    def flush(self):
+        hydration.invalidate_posts(self.post_ids)
+        for group_id in self.group_ids:
+            feeds.invalidate_group_feed(group_id)
+        names = [counts.ALL_POSTS]
+        for author_id in self.author_ids:
+            names += [
+                counts.author_posts(author_id),
+                counts.author_archived_posts(author_id),
+            ]
+        core_counts.invalidate(*names)
+        pages.purge_posts(self.post_ids, self.author_ids, self.group_ids)
+
+
+def pending_invalidation():
+    return getattr(_batch, 'pending', None)
+
+
+@contextmanager
+def batch_invalidation():
+    """Внутри блока сигналы не сбрасывают кэши по каждому объекту, а
+    копят их в Invalidation; сброс выполняется один раз на выходе."""
+    _batch.pending = pending = Invalidation()
+    try:
+        yield pending
+    finally:
+        _batch.pending = None
+        pending.flush()
+
+
+def deferred(post, *group_ids):
+    pending = pending_invalidation()
+    if pending is None:
+        return False
+    pending.add_post(post, *group_ids)
+    return True
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    # Объявлен до update_group_feeds: тот обновляет _loaded_group_id,
+    # а страницу прежней группы тоже надо сбросить.
+    loaded_group_id = instance._loaded_group_id
+    if not deferred(instance, loaded_group_id):
+        group_ids = {instance.group_id, loaded_group_id} - {None}
+        pages.purge_posts([instance.id], [instance.author_id], group_ids)
+
+
+@receiver(post_save, sender=Post)
+def update_group_feeds(sender, instance, created, **kwargs):
+    loaded_group_id = instance._loaded_group_id
+    instance._loaded_group_id = instance.group_id
+    if deferred(instance, loaded_group_id):
+        return
+    if created:
+        if instance.group_id:
+            feeds.push_to_group_feed(instance)
+    elif loaded_group_id != instance.group_id or instance.is_deleted:
+        for group_id in (loaded_group_id, instance.group_id):
+            if group_id:
+                feeds.invalidate_group_feed(group_id)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_group_feed(sender, instance, **kwargs):
+    if instance.group_id and not deferred(instance):
+        feeds.invalidate_group_feed(instance.group_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_cached_post(sender, instance, **kwargs):
+    if not deferred(instance):
+        hydration.invalidate_post(instance.id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_graph(sender, instance, **kwargs):
+    follow_graph.invalidate(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_counts(sender, instance, **kwargs):
+    if not deferred(instance):
+        counts.invalidate_post(instance)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_count(sender, instance, **kwargs):
+    # Новые посты авторов подписки счётчик не сбрасывают: их учтёт
+    # истечение FOLLOW_COUNT_TIMEOUT.
+    core_counts.invalidate(counts.follow_posts(instance.user_id))
+
+
+@receiver(post_save, sender=Post)
+def record_trending_post(sender, instance, created, **kwargs):
+    if created:
+        trending.record_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def record_trending_comment(sender, instance, created, **kwargs):
+    if created:
+        at = time.time()
+        transaction.on_commit(lambda: jobs.enqueue(
+            'posts.comment_created',
+            key=f'comment_created:{instance.id}',
+            comment_id=instance.id,
+            at=at,
+        ))
+
+
+@receiver(post_save, sender=Follow)
+def record_trending_follow(sender, instance, created, **kwargs):
+    if created:
+        at = time.time()
+        transaction.on_commit(lambda: jobs.enqueue(
+            'posts.follow_created',
+            key=f'follow_created:{instance.id}:{int(at)}',
+            author_id=instance.author_id,
+            at=at,
+        ))
+
+
+@receiver(post_save, sender=Post)
+def publish_live_post(sender, instance, created, **kwargs):
+    if created:
+        # После коммита, иначе клиент может запросить ещё невидимый пост.
+        transaction.on_commit(lambda: live.publish_post(instance))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    pending = pending_invalidation()
+    if pending is None:
+        pagecache.purge(pages.post_tag(instance.post_id))
+    else:
+        pending.post_ids.add(instance.post_id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def purge_page_cache(sender, update_fields=None, **kwargs):
+    # Название группы и имя автора есть почти на любой странице. Вход
+    # пользователя меняет только last_login -- его на страницах нет.
+    if update_fields != frozenset(['last_login']):
+        pagecache.purge()
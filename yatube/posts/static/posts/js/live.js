@@ -0,0 +1,29 @@
+// Живая лента: ждёт по Server-Sent Events id новых постов и вставляет
+// в начало ленты только их карточки (posts:post_cards).
+(function () {
+  'use strict';
+  var feed = document.querySelector('[data-live-events]');
+  if (!feed || !window.EventSource || !window.fetch) {
+    return;
+  }
+  var newest = Number(feed.dataset.liveAfter) || 0;
+  var url = feed.dataset.liveEvents + (newest ? '?after=' + newest : '');
+  var source = new EventSource(url);
+
+  source.addEventListener('posts', function (event) {
+    var ids = event.data.split(',').map(Number).filter(function (id) {
+      return id > newest;
+    });
+    if (!ids.length) {
+      return;
+    }
+    newest = Math.max.apply(null, ids.concat(newest));
+    fetch(feed.dataset.liveCards + '?ids=' + ids.join(','), {
+      credentials: 'same-origin'
+    }).then(function (response) {
+      return response.ok ? response.text() : '';
+    }).then(function (html) {
+      feed.insertAdjacentHTML('afterbegin', html);
+    });
+  });
+})();
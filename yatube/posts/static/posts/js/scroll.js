@@ -0,0 +1,43 @@
+// Бесконечная прокрутка: когда конец ленты виден, подгружает следующую
+// порцию карточек по курсору (posts:*_more) вместо перехода на страницу.
+(function () {
+  'use strict';
+  var feed = document.querySelector('[data-more-url]');
+  if (!feed || !feed.dataset.moreCursor || !window.IntersectionObserver ||
+      !window.fetch) {
+    return;
+  }
+  var cursor = feed.dataset.moreCursor;
+  var loading = false;
+  var sentinel = document.createElement('div');
+  feed.parentNode.insertBefore(sentinel, feed.nextSibling);
+  document.querySelectorAll('nav[aria-label="Page navigation"]')
+    .forEach(function (nav) {
+      nav.hidden = true;
+    });
+
+  var observer = new IntersectionObserver(function (entries) {
+    if (loading || !entries[0].isIntersecting) {
+      return;
+    }
+    loading = true;
+    fetch(feed.dataset.moreUrl + '?before=' + encodeURIComponent(cursor), {
+      credentials: 'same-origin'
+    }).then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      cursor = response.headers.get('X-Next-Cursor');
+      return response.text();
+    }).then(function (html) {
+      feed.insertAdjacentHTML('beforeend', html);
+      loading = false;
+      if (!cursor) {
+        observer.disconnect();
+      }
+    }).catch(function () {
+      observer.disconnect();
+    });
+  }, {rootMargin: '600px'});
+  observer.observe(sentinel);
+})();
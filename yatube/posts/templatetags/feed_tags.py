@@ -0,0 +1,27 @@
+from django import template
+
+from ..cursors import encode_cursor
+
+register = template.Library()
+
+
+@register.filter
+def next_cursor(page_obj):
+    """Курсор порции после страницы или пустая строка на последней."""
+    if not page_obj.has_next():
+        return ''
+    return encode_cursor(page_obj[len(page_obj) - 1])
+
+
+@register.inclusion_tag(
+    'posts/includes/follow_button.html', takes_context=True
+)
+def follow_button(context, post):
+    """Кнопка подписки на автора поста по множеству followed_authors."""
+    followed = context.get('followed_authors')
+    user = context['request'].user
+    return {
+        'author': post.author,
+        'show': followed is not None and post.author_id != user.id,
+        'following': followed is not None and post.author_id in followed,
+    }
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import revisions
+from ..archive import archive_posts
+from ..models import (
+    ArchivedComment, ArchivedPost, Comment, Post, PostRevision, User
+)
+
+
+class PostArchiveTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='auth')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Старый пост',
+        )
+        Post.objects.filter(id=cls.old_post.id).update(
+            pub_date=timezone.now() - timedelta(days=1000)
+        )
+        Comment.objects.create(
+            post=cls.old_post,
+            author=cls.author,
+            text='Старый комментарий',
+        )
+        for i in range(10):
+            Post.objects.create(author=cls.author, text=f'Новый пост {i}')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_archive_moves_old_posts_with_comments(self):
+        archived = archive_posts()
+        self.assertEqual(archived, 1)
+        self.assertFalse(Post.objects.filter(id=self.old_post.id).exists())
+        self.assertTrue(ArchivedPost.objects.filter(
+            id=self.old_post.id, text='Старый пост'
+        ).exists())
+        self.assertEqual(ArchivedComment.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_hidden_comments_stay_hidden(self):
+        hidden = Comment.objects.create(
+            post=self.old_post, author=self.author, text='Скрытый'
+        )
+        hidden.soft_delete()
+        archive_posts()
+        self.assertTrue(
+            ArchivedComment.all_objects.get(id=hidden.id).is_deleted
+        )
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.old_post.id])
+        )
+        self.assertNotContains(response, 'Скрытый')
+
+    def test_posts_with_history_are_not_archived(self):
+        old_text = self.old_post.text
+        self.old_post.text = 'Исправленный старый пост'
+        self.old_post.save()
+        revisions.record_edit(self.old_post, old_text, self.author)
+        self.assertEqual(archive_posts(), 0)
+        self.assertEqual(
+            PostRevision.objects.filter(post=self.old_post).count(), 2
+        )
+
+    def test_post_detail_serves_archived_post(self):
+        archive_posts()
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.old_post.id])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context['post'].text, 'Старый пост')
+        self.assertEqual(len(response.context['comments']), 1)
+
+    def test_profile_deep_page_serves_archived_posts(self):
+        archive_posts()
+        url = reverse('posts:profile', args=[self.author.username])
+        response = self.guest_client.get(url, {'page': 2})
+        self.assertEqual(response.context['number_of_posts'], 11)
+        self.assertEqual(
+            [post.text for post in response.context['page_obj']],
+            ['Старый пост'],
+        )
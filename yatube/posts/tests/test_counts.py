@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import counts as core_counts
+
+from .. import counts
+from ..models import Follow, Post, User
+
+
+class PostCountsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Пост {i}') for i in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_is_cached(self):
+        posts = Post.objects.all()
+        self.assertEqual(
+            core_counts.get_count(counts.ALL_POSTS, posts),
+            core_counts.Count(3, False),
+        )
+        with self.assertNumQueries(0):
+            core_counts.get_count(counts.ALL_POSTS, posts)
+
+    def test_new_post_invalidates_counts(self):
+        core_counts.get_count(counts.ALL_POSTS, Post.objects.all())
+        core_counts.get_count(
+            counts.author_posts(self.author.id), self.author.posts.all()
+        )
+        Post.objects.create(author=self.author, text='Ещё пост')
+        self.assertEqual(
+            core_counts.get_count(
+                counts.ALL_POSTS, Post.objects.all()
+            ).value, 4
+        )
+        self.assertEqual(
+            core_counts.get_count(
+                counts.author_posts(self.author.id), self.author.posts.all()
+            ).value, 4
+        )
+
+    def test_follow_invalidates_follow_count(self):
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 0)
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+
+    def test_profile_count_is_cached(self):
+        self.client.force_login(self.reader)
+        url = reverse('posts:profile', args=[self.author.username])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.context['number_of_posts'], 3)
+        self.assertFalse(
+            [q for q in queries.captured_queries if 'COUNT(' in q['sql']]
+        )
+
+    @override_settings(COUNT_ESTIMATE_THRESHOLD=2)
+    def test_large_table_is_estimated(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        total = core_counts.get_count(
+            counts.ALL_POSTS, Post.objects.all(), table=Post
+        )
+        self.assertEqual(total, core_counts.Count(3, True))
+        response = self.client.get(reverse('posts:index'))
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.paginator.approximate)
+        self.assertEqual(len(page_obj), 3)
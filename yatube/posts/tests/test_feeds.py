@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..feeds import GROUP_FEED_KEY, get_group_feed
+from ..models import Group, Post, User
+
+
+@override_settings(POSTS_PER_PAGE=2, GROUP_FEED_PAGES=2)
+class GroupFeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая', slug='other', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}'
+            )
+            for i in range(6)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_is_capped(self):
+        feed = get_group_feed(self.group.id)
+        self.assertEqual(feed['count'], 6)
+        self.assertEqual(
+            feed['ids'], [post.id for post in reversed(self.posts)][:4]
+        )
+
+    def test_new_post_is_pushed_without_rebuild(self):
+        get_group_feed(self.group.id)
+        post = Post.objects.create(
+            author=self.author, group=self.group, text='Новый пост'
+        )
+        feed = cache.get(GROUP_FEED_KEY.format(self.group.id))
+        self.assertEqual(feed['ids'][0], post.id)
+        self.assertEqual(len(feed['ids']), 4)
+        self.assertEqual(feed['count'], 7)
+
+    def test_group_change_invalidates_both_feeds(self):
+        get_group_feed(self.group.id)
+        get_group_feed(self.other_group.id)
+        post = Post.objects.get(id=self.posts[-1].id)
+        post.group = self.other_group
+        post.save()
+        self.assertIsNone(cache.get(GROUP_FEED_KEY.format(self.group.id)))
+        self.assertIsNone(
+            cache.get(GROUP_FEED_KEY.format(self.other_group.id))
+        )
+
+    def test_group_pages_from_cache_and_database(self):
+        url = reverse('posts:group_list', args=[self.group.slug])
+        expected = [post.text for post in reversed(self.posts)]
+        self.client.get(url)
+        for page in (1, 2, 3):
+            with self.subTest(page=page):
+                response = self.client.get(url, {'page': page})
+                self.assertEqual(
+                    [post.text for post in response.context['page_obj']],
+                    expected[(page - 1) * 2:page * 2],
+                )
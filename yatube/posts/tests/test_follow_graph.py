@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import follow_graph
+from ..models import Follow, User
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.other_user = User.objects.create_user(username='other_reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{i}') for i in range(4)
+        ]
+        for author in cls.authors[:3]:
+            Follow.objects.create(user=cls.user, author=author)
+        for author in cls.authors[1:]:
+            Follow.objects.create(user=cls.other_user, author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_membership_and_intersection_from_cache(self):
+        ids = [author.id for author in self.authors]
+        follow_graph.following_ids(self.user.id)
+        follow_graph.following_ids(self.other_user.id)
+        with self.assertNumQueries(0):
+            self.assertTrue(follow_graph.is_following(self.user.id, ids[0]))
+            self.assertFalse(follow_graph.is_following(self.user.id, ids[3]))
+            self.assertEqual(
+                follow_graph.following_among(self.user.id, ids), set(ids[:3])
+            )
+            self.assertEqual(
+                follow_graph.common_following(
+                    self.user.id, self.other_user.id
+                ),
+                ids[1:3],
+            )
+
+    def test_followers(self):
+        self.assertEqual(
+            list(follow_graph.follower_ids(self.authors[1].id)),
+            sorted([self.user.id, self.other_user.id]),
+        )
+
+    def test_follow_and_unfollow_invalidate_graph(self):
+        author = self.authors[3]
+        self.assertFalse(follow_graph.is_following(self.user.id, author.id))
+        self.client.get(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+        self.assertTrue(follow_graph.is_following(self.user.id, author.id))
+        self.assertIn(self.user.id, follow_graph.follower_ids(author.id))
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[author.username])
+        )
+        self.assertFalse(follow_graph.is_following(self.user.id, author.id))
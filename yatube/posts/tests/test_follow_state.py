@@ -0,0 +1,90 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, User
+
+
+class FollowStateTest(TestCase):
+    """Кнопки подписки в лентах без запроса на каждого автора."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.followed = User.objects.create_user(username='followed')
+        cls.other = User.objects.create_user(username='other')
+        Follow.objects.create(user=cls.reader, author=cls.followed)
+        for author in (cls.followed, cls.other, cls.reader):
+            Post.objects.create(author=author, group=cls.group, text='Пост')
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[cls.group.slug]),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_buttons(self):
+        self.client.force_login(self.reader)
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(
+                    response,
+                    reverse('posts:profile_unfollow', args=['followed']),
+                )
+                self.assertContains(
+                    response, reverse('posts:profile_follow', args=['other'])
+                )
+                self.assertNotContains(
+                    response, reverse('posts:profile_follow', args=['reader'])
+                )
+
+    def test_guest_sees_no_buttons(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotContains(
+                    response, reverse('posts:profile_follow', args=['other'])
+                )
+
+    def test_buttons_follow_changes_at_once(self):
+        self.client.force_login(self.reader)
+        follow = reverse('posts:profile_follow', args=['other'])
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), follow)
+        self.client.get(follow)
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotContains(response, follow)
+                self.assertContains(
+                    response,
+                    reverse('posts:profile_unfollow', args=['other']),
+                )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_authors(self):
+        self.client.force_login(self.reader)
+        for number, url in enumerate(self.urls):
+            with self.subTest(url=url):
+                few = self.count_queries(url)
+                for i in range(3):
+                    author = User.objects.create_user(
+                        username=f'new{number}-{i}'
+                    )
+                    Post.objects.create(
+                        author=author, group=self.group, text='Пост'
+                    )
+                self.assertEqual(self.count_queries(url), few)
@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..cursors import decode_cursor, encode_cursor
+from ..templatetags.feed_tags import next_cursor
+from ..models import ArchivedPost, Follow, Group, Post, User
+
+
+@override_settings(POSTS_PER_PAGE=3)
+class FeedFragmentTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        now = timezone.now()
+        for number in range(7):
+            post = Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {number}'
+            )
+            # У последних постов одна дата: курсор различает их по id.
+            post.pub_date = now - timedelta(minutes=min(number, 4))
+            post.save()
+        cls.posts = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def read_feed(self, url, cursor=''):
+        post_ids = []
+        while True:
+            response = self.client.get(url, {'before': cursor})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotContains(response, '<html')
+            post_ids += [post.id for post in response.context['posts']]
+            cursor = response.get('X-Next-Cursor')
+            if cursor is None:
+                return post_ids
+
+    def test_fragments_walk_whole_feed(self):
+        expected = [post.id for post in self.posts]
+        urls = (
+            reverse('posts:index_more'),
+            reverse('posts:group_more', args=[self.group.slug]),
+            reverse('posts:profile_more', args=[self.author.username]),
+            reverse('posts:follow_more'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.read_feed(url), expected)
+
+    def test_fragments_continue_paginated_page(self):
+        # Граница второй страницы проходит между постами с одной датой.
+        expected = [post.id for post in self.posts[3:]]
+        pages = (
+            ('posts:index', 'posts:index_more', []),
+            ('posts:profile', 'posts:profile_more', [self.author.username]),
+        )
+        for page_name, more_name, args in pages:
+            with self.subTest(page=page_name):
+                response = self.client.get(
+                    reverse(page_name, args=args), {'page': 2}
+                )
+                page = response.context['page_obj']
+                post_ids = [post.id for post in page]
+                post_ids += self.read_feed(
+                    reverse(more_name, args=args), next_cursor(page)
+                )
+                self.assertEqual(post_ids, expected)
+
+    def test_profile_fragments_continue_into_archive(self):
+        archived = ArchivedPost.objects.create(
+            id=10000,
+            author=self.author,
+            text='Архивный пост',
+            created=timezone.now() - timedelta(days=400),
+            pub_date=timezone.now() - timedelta(days=400),
+        )
+        post_ids = self.read_feed(
+            reverse('posts:profile_more', args=[self.author.username])
+        )
+        self.assertEqual(post_ids[-1], archived.id)
+
+    def test_cache_headers(self):
+        response = Client().get(reverse('posts:index_more'))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=', response['Cache-Control'])
+        for url in (reverse('posts:index_more'), reverse('posts:follow_more')):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('private', response['Cache-Control'])
+                self.assertNotIn('public', response['Cache-Control'])
+
+    def test_loaded_cards_show_follow_buttons(self):
+        other = User.objects.create_user(username='other')
+        post = Post.objects.create(author=other, text='Пост другого')
+        unfollow = reverse('posts:profile_unfollow', args=['author'])
+        follow = reverse('posts:profile_follow', args=['other'])
+        responses = (
+            self.client.get(reverse('posts:index_more')),
+            self.client.get(
+                reverse('posts:post_cards'),
+                {'ids': f'{post.id},{self.posts[0].id}'},
+            ),
+        )
+        for response in responses:
+            with self.subTest(url=response.request['PATH_INFO']):
+                self.assertContains(response, unfollow)
+                self.assertContains(response, follow)
+        response = Client().get(reverse('posts:index_more'))
+        self.assertNotContains(response, follow)
+
+    def test_page_points_to_next_fragment(self):
+        response = self.client.get(
+            reverse('posts:group_list', args=[self.group.slug])
+        )
+        cursor = encode_cursor(self.posts[2])
+        self.assertContains(response, f'data-more-cursor="{cursor}"')
+
+    def test_cursor_round_trip(self):
+        post = self.posts[0]
+        self.assertEqual(
+            decode_cursor(encode_cursor(post)), (post.pub_date, post.id)
+        )
+
+    def test_bad_cursor(self):
+        for cursor in ('x', '9' * 30 + '-1', '1-' + '9' * 30, '1-0'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse('posts:index_more'), {'before': cursor}
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_follow_fragment_for_guest(self):
+        response = Client().get(reverse('posts:follow_more'))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..hydration import hydrate_posts
+from ..models import Group, Post, User
+
+
+class HydratePostsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='auth', first_name='Имя', last_name='Фамилия'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author,
+                group=cls.group if i % 2 else None,
+                text=f'Пост {i}',
+            )
+            for i in range(4)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_keeps_order_and_skips_missing(self):
+        ids = [self.posts[2].id, 0, self.posts[0].id, self.posts[3].id]
+        with self.assertNumQueries(1):
+            posts = hydrate_posts(ids)
+        self.assertEqual(
+            [post.text for post in posts], ['Пост 2', 'Пост 0', 'Пост 3']
+        )
+
+    def test_second_call_is_served_from_cache(self):
+        ids = [post.id for post in self.posts]
+        hydrate_posts(ids)
+        with self.assertNumQueries(0):
+            posts = hydrate_posts(ids)
+            self.assertEqual(posts[1].author.get_full_name(), 'Имя Фамилия')
+            self.assertEqual(posts[1].group.slug, 'group')
+            self.assertIsNone(posts[0].group)
+
+    def test_post_save_invalidates_cache(self):
+        post = self.posts[0]
+        hydrate_posts([post.id])
+        post.text = 'Изменённый пост'
+        post.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                hydrate_posts([post.id])[0].text, 'Изменённый пост'
+            )
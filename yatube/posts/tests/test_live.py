@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import pubsub
+
+from .. import live
+from ..models import Follow, Group, Post, User
+
+
+class LiveFeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.old_post = Post.objects.create(author=cls.author, text='Старый')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_new_posts_are_published_to_feed_channels(self):
+        subscription = pubsub.subscribe([
+            live.POSTS_CHANNEL,
+            live.group_channel(self.group.id),
+            live.author_channel(self.author.id),
+        ])
+        post = Post.objects.create(
+            author=self.author, group=self.group, text='Новый'
+        )
+        live.publish_post(post)
+        self.assertEqual(subscription.get(timeout=0.1), [post.id] * 3)
+        subscription.close()
+
+    def test_stream_sends_missed_posts(self):
+        post = Post.objects.create(author=self.author, text='Новый')
+        stream = live.event_stream(
+            [live.POSTS_CHANNEL], Post.objects.all(), after=self.old_post.id
+        )
+        self.assertTrue(next(stream).startswith('retry:'))
+        self.assertEqual(
+            next(stream), f'id: {post.id}\nevent: posts\ndata: {post.id}\n\n'
+        )
+        stream.close()
+
+    def test_stream_sends_published_posts(self):
+        stream = live.event_stream([live.POSTS_CHANNEL], Post.objects.all())
+        next(stream)
+        post = Post.objects.create(author=self.author, text='Новый')
+        live.publish_post(post)
+        self.assertIn(f'data: {post.id}\n', next(stream))
+        stream.close()
+
+    def test_event_endpoints(self):
+        urls = (
+            reverse('posts:index_events'),
+            reverse('posts:group_events', args=[self.group.slug]),
+            reverse('posts:follow_events'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response['Content-Type'], 'text/event-stream')
+                self.assertEqual(response['Cache-Control'], 'no-cache')
+                response.close()
+
+    @override_settings(LIVE_MAX_STREAMS=1)
+    def test_streams_are_limited(self):
+        url = reverse('posts:index_events')
+        first = self.client.get(url)
+        self.assertTrue(first.streaming)
+        busy = self.client.get(url)
+        self.assertFalse(busy.streaming)
+        self.assertEqual(
+            busy.content.decode(), f'retry: {settings.LIVE_BUSY_RETRY_MS}\n\n'
+        )
+        first.close()
+        second = self.client.get(url)
+        self.assertTrue(second.streaming)
+        second.close()
+
+    def test_follow_events_for_guest(self):
+        response = Client().get(reverse('posts:follow_events'))
+        self.assertEqual(response.status_code, 204)
+
+    def test_post_cards(self):
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        response = self.client.get(
+            reverse('posts:post_cards'),
+            {'ids': f'{self.old_post.id},{post.id},x'},
+        )
+        self.assertEqual(
+            [card.id for card in response.context['posts']],
+            [post.id, self.old_post.id],
+        )
+        self.assertNotContains(response, '<html')
+
+    @override_settings(LIVE_HEARTBEAT=0.01)
+    def test_out_of_range_ids_are_ignored(self):
+        huge = '9' * 25
+        response = self.client.get(
+            reverse('posts:post_cards'), {'ids': f'{huge},{self.old_post.id}'}
+        )
+        self.assertEqual(
+            [card.id for card in response.context['posts']],
+            [self.old_post.id],
+        )
+        response = self.client.get(
+            reverse('posts:index_events'), {'after': huge}
+        )
+        stream = iter(response.streaming_content)
+        next(stream)
+        # Пропущенные посты ищутся после строки retry.
+        self.assertEqual(next(stream), b':\n\n')
+        response.close()
+
+    def test_first_page_subscribes_to_live_updates(self):
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertContains(response, reverse('posts:follow_events'))
+        self.assertContains(response, f'data-live-after="{self.old_post.id}"')
@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import jobs, pagecache
+from core.models import Job
+
+from .. import feeds, pages
+from ..models import Comment, Group, Post, User
+
+
+@override_settings(MODERATION_CHUNK_SIZE=2)
+class ModerationActionsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая', slug='other', description='Описание'
+        )
+        for i in range(5):
+            post = Post.objects.create(
+                author=cls.spammer, group=cls.group, text=f'Спам {i}'
+            )
+            for j in range(3):
+                Comment.objects.create(
+                    post=post, author=cls.spammer, text=f'Спам {j}'
+                )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+        self.post_ids = list(Post.objects.values_list('id', flat=True))
+
+    def run_action(self, action, **data):
+        response = self.client.post(self.url, {
+            'action': action,
+            '_selected_action': self.post_ids,
+            **data,
+        })
+        self.assertEqual(response.status_code, 302)
+        queued_job = Job.objects.get()
+        # Действие только ставит задачу.
+        self.assertEqual(Post.objects.count(), 5)
+        version = pagecache.version(pages.INDEX)
+        self.assertEqual(jobs.run_pending(), 1)
+        queued_job.refresh_from_db()
+        self.assertEqual(queued_job.status, Job.DONE)
+        self.assertEqual(jobs.progress(queued_job), (5, 5))
+        # Кэш страниц сброшен один раз, а не на каждый объект.
+        self.assertEqual(pagecache.version(pages.INDEX), version + 1)
+
+    def test_delete_in_background(self):
+        self.run_action('delete_in_background')
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+
+    def test_move_to_group(self):
+        self.assertEqual(feeds.get_group_feed(self.other_group.id)['count'], 0)
+        self.run_action('move_to_group', group=self.other_group.id)
+        self.assertEqual(
+            Post.objects.filter(group=self.other_group).count(), 5
+        )
+        self.assertEqual(feeds.get_group_feed(self.other_group.id)['count'], 5)
+        self.assertEqual(feeds.get_group_feed(self.group.id)['count'], 0)
+
+    def test_move_requires_group(self):
+        response = self.client.post(self.url, {
+            'action': 'move_to_group',
+            '_selected_action': self.post_ids,
+            'group': '',
+        }, follow=True)
+        self.assertContains(response, 'Выберите сообщество.')
+        self.assertFalse(Job.objects.exists())
+
+    def test_remove_from_group(self):
+        self.run_action('remove_from_group')
+        self.assertFalse(Post.objects.filter(group__isnull=False).exists())
+        self.assertEqual(feeds.get_group_feed(self.group.id)['count'], 0)
+
+    def test_delete_selected_is_replaced(self):
+        response = self.client.get(self.url)
+        action_field = response.context['action_form'].fields['action']
+        actions = dict(action_field.choices)
+        self.assertIn('delete_in_background', actions)
+        self.assertNotIn('delete_selected', actions)
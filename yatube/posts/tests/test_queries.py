@@ -0,0 +1,60 @@
+from django.contrib.auth.models import Group as UserGroup
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class AnonymousQueriesTest(TestCase):
+    """Аноним не читает сессию, пользователя и группы прав."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_post_detail(self):
+        with self.assertNumQueries(4):
+            self.client.get(reverse('posts:post_detail', args=[self.post.id]))
+
+    def test_group_posts(self):
+        with self.assertNumQueries(4):
+            self.client.get(reverse('posts:group_list', args=['group']))
+
+    def test_about(self):
+        with self.assertNumQueries(0):
+            self.client.get(reverse('about:author'))
+
+
+class SessionQueriesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.editor = User.objects.create_user(username='editor')
+        cls.editor.groups.add(UserGroup.objects.create(name='staff'))
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def test_session_is_read_from_cache(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('about:author'))
+
+    def test_staff_can_edit(self):
+        self.client.force_login(self.editor)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        self.assertTrue(response.context['permission_check'])
+        self.assertContains(
+            response, reverse('posts:post_edit', args=[self.post.id])
+        )
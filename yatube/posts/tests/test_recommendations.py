@@ -0,0 +1,57 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, FollowRecommendation, Post, User
+from ..recommendations import compute_scores
+
+
+class ComputeScoresTest(TestCase):
+    def test_friends_of_friends_and_co_commenters(self):
+        follows = [(1, 2), (2, 3), (2, 4), (3, 4)]
+        comments = [(1, 10), (5, 10), (5, 11)]
+        scores = compute_scores(follows, comments, 0.5)
+        self.assertEqual(scores[1], {3: 1, 4: 1, 5: 0.5})
+        # На автора 4 пользователь 2 уже подписан.
+        self.assertEqual(scores[2], {})
+
+
+class RecommendationsViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.author = User.objects.create_user(username='author')
+        Follow.objects.create(user=cls.user, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.author)
+        post = Post.objects.create(author=cls.author, text='Пост')
+        Comment.objects.create(post=post, author=cls.friend, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_command_stores_top_recommendations(self):
+        call_command('build_recommendations', stdout=StringIO())
+        self.assertEqual(
+            list(self.user.recommendations.values_list('author', flat=True)),
+            [self.author.id],
+        )
+
+    def test_recommendations_rendered_and_hidden_after_follow(self):
+        FollowRecommendation.objects.create(
+            user=self.user, author=self.author, score=1
+        )
+        url = reverse('posts:follow_index')
+        response = self.client.get(url)
+        self.assertEqual(
+            [item.author for item in response.context['recommendations']],
+            [self.author],
+        )
+        Follow.objects.create(user=self.user, author=self.author)
+        response = self.client.get(url)
+        self.assertEqual(response.context['recommendations'], [])
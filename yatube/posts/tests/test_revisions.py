@@ -0,0 +1,93 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import revisions
+from ..models import Post, PostRevision, User
+
+
+class DeltaTest(TestCase):
+    def test_round_trip(self):
+        pairs = (
+            ('', 'Новый текст'),
+            ('Старый текст поста', 'Новый текст поста!'),
+            ('Удалить всё', ''),
+            ('abc', 'abc'),
+        )
+        for old, new in pairs:
+            with self.subTest(old=old, new=new):
+                delta = revisions.make_delta(old, new)
+                self.assertEqual(revisions.apply_delta(old, delta), new)
+
+    def test_delta_is_compact(self):
+        old = 'Длинный текст поста. ' * 20
+        delta = revisions.make_delta(old, old + 'Дописано.')
+        self.assertLess(len(json.dumps(delta, ensure_ascii=False)), 20)
+
+
+@override_settings(REVISION_SNAPSHOT_EVERY=3)
+class PostRevisionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Версия 0')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def edit(self, text):
+        response = self.client.post(
+            reverse('posts:post_edit', args=[self.post.id]), {'text': text}
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_edits_are_recorded(self):
+        texts = ['Версия 0'] + [f'Версия {i} поста' for i in range(1, 8)]
+        for text in texts[1:]:
+            self.edit(text)
+        self.edit(texts[-1])
+        post_revisions = PostRevision.objects.filter(post=self.post)
+        self.assertEqual(post_revisions.count(), len(texts))
+        self.assertEqual(
+            list(post_revisions.filter(is_snapshot=True).values_list(
+                'number', flat=True
+            )),
+            [0, 3, 6],
+        )
+        self.assertEqual(post_revisions.last().editor, self.author)
+        for number, text in enumerate(texts):
+            with self.subTest(number=number):
+                with self.assertNumQueries(1):
+                    self.assertEqual(
+                        revisions.text_at(self.post.id, number), text
+                    )
+        self.assertIsNone(revisions.text_at(self.post.id, len(texts)))
+        self.assertEqual(
+            [text for _, text in revisions.history(self.post.id)], texts
+        )
+
+    def test_stale_old_text(self):
+        self.edit('Правка первого редактора')
+        # Второй редактор открыл форму до первой правки.
+        self.post.refresh_from_db()
+        self.post.text = 'Правка второго редактора'
+        self.post.save()
+        revisions.record_edit(self.post, 'Версия 0', self.author)
+        self.assertEqual(
+            [text for _, text in revisions.history(self.post.id)],
+            ['Версия 0', 'Правка первого редактора',
+             'Правка второго редактора'],
+        )
+
+    def test_revisions_cannot_be_deleted_in_admin(self):
+        self.edit('Новая версия')
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        self.client.force_login(admin)
+        revision = PostRevision.objects.last()
+        response = self.client.get(
+            reverse('admin:posts_postrevision_delete', args=[revision.id])
+        )
+        self.assertEqual(response.status_code, 403)
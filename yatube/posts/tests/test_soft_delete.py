@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import feeds, moderation, recommendations
+from ..jobs import comment_created
+from ..models import Comment, FollowRecommendation, Group, Post, User
+
+
+class SoftDeleteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост'
+        )
+        cls.kept = Post.objects.create(
+            author=cls.author, group=cls.group, text='Оставшийся пост'
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.kept, author=cls.author, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_deleted_post_is_hidden(self):
+        self.assertEqual(feeds.get_group_feed(self.group.id)['count'], 2)
+        self.post.soft_delete()
+        self.assertTrue(Post.all_objects.filter(id=self.post.id).exists())
+        self.assertEqual(feeds.get_group_feed(self.group.id)['count'], 1)
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(
+                    list(response.context['page_obj']), [self.kept]
+                )
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_deleted_comment_is_hidden(self):
+        self.comment.soft_delete()
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.kept.id])
+        )
+        self.assertNotContains(response, 'Комментарий')
+
+    def test_hide_action(self):
+        moderation.moderate('post', moderation.HIDE, [self.post.id])
+        self.assertEqual(list(Post.objects.all()), [self.kept])
+        self.assertEqual(feeds.get_group_feed(self.group.id)['count'], 1)
+
+    def test_restore_action(self):
+        moderation.moderate('post', moderation.HIDE, [self.post.id])
+        moderation.moderate('post', moderation.RESTORE, [self.post.id])
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(feeds.get_group_feed(self.group.id)['count'], 2)
+        moderation.moderate('comment', moderation.HIDE, [self.comment.id])
+        moderation.moderate('comment', moderation.RESTORE, [self.comment.id])
+        self.assertEqual(list(Comment.objects.all()), [self.comment])
+
+    def test_admin_lists_deleted(self):
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        self.client.force_login(admin)
+        self.post.soft_delete()
+        url = reverse('admin:posts_post_changelist')
+        response = self.client.get(url)
+        self.assertEqual(response.context['cl'].result_count, 2)
+        response = self.client.get(url, {'is_deleted__exact': 1})
+        self.assertEqual(list(response.context['cl'].result_list), [
+            self.post
+        ])
+
+    def test_comments_of_deleted_post_are_ignored(self):
+        reader = User.objects.create_user(username='reader')
+        commenter = User.objects.create_user(username='commenter')
+        for author in (reader, commenter):
+            Comment.objects.create(
+                post=self.post, author=author, text='Комментарий'
+            )
+        self.post.soft_delete()
+        recommendations.build_recommendations()
+        self.assertFalse(FollowRecommendation.objects.filter(
+            user=reader, author=commenter
+        ).exists())
+        comment = Comment.objects.filter(post=self.post).first()
+        comment_created(comment.id, 0)
+        self.assertEqual(
+            self.client.get(reverse('posts:trending')).context['posts'],
+            [],
+        )
+
+    def test_purge_deleted(self):
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Под удалённым'
+        )
+        self.post.soft_delete()
+        out = StringIO()
+        call_command('purge_deleted', batch_size=1, stdout=out)
+        self.assertIn('Удалено постов: 1', out.getvalue())
+        self.assertEqual(list(Post.all_objects.all()), [self.kept])
+        self.assertEqual(list(Comment.all_objects.all()), [self.comment])
@@ -0,0 +1,99 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from core.jobs import run_pending
+from core.models import Job
+
+from .. import trending
+from ..models import Comment, Group, Post, User
+
+HOUR = 60 * 60
+
+
+@override_settings(TRENDING_HALF_LIFE=HOUR, TRENDING_SIZE=3)
+class TrendingScoresTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_recent_events_outweigh_old_ones(self):
+        trending.bump('test', 1, weight=3, now=0)
+        trending.bump('test', 2, weight=1, now=2 * HOUR)
+        self.assertEqual(trending.top('test', 2), [2, 1])
+        trending.bump('test', 1, weight=1, now=2 * HOUR)
+        self.assertEqual(trending.top('test', 2), [1, 2])
+
+    def test_board_is_capped(self):
+        for item_id in range(5):
+            trending.bump('test', item_id, weight=item_id + 1, now=0)
+        self.assertEqual(trending.top('test', 10), [4, 3, 2])
+
+
+class TrendingViewTest(TransactionTestCase):
+    # Задачи ставятся в transaction.on_commit, TestCase их не выполняет.
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.commented_post = Post.objects.create(
+            author=self.author, group=self.group, text='Обсуждаемый пост'
+        )
+        self.other_post = Post.objects.create(
+            author=self.author, group=self.group, text='Другой пост'
+        )
+
+    def test_comments_and_follows_update_trending(self):
+        self.client.post(
+            reverse('posts:add_comment', args=[self.commented_post.id]),
+            {'text': 'Комментарий'},
+        )
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.assertEqual(run_pending(), 2)
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(
+            response.context['posts'], [self.commented_post, self.other_post]
+        )
+        self.assertEqual(response.context['groups'], [self.group])
+        self.assertEqual(response.context['authors'], [self.author])
+
+    def test_group_page_shows_trending_posts(self):
+        self.client.post(
+            reverse('posts:add_comment', args=[self.commented_post.id]),
+            {'text': 'Комментарий'},
+        )
+        run_pending()
+        response = self.client.get(
+            reverse('posts:group_list', args=[self.group.slug])
+        )
+        self.assertEqual(response.context['trending_posts'][0],
+                         self.commented_post)
+
+    def test_unknown_follow_target_is_skipped(self):
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        run_pending()
+        self.author.delete()
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(response.context['authors'], [])
+
+    def test_job_is_queued_after_commit(self):
+        with transaction.atomic():
+            Comment.objects.create(
+                post=self.commented_post, author=self.user, text='Текст'
+            )
+            self.assertFalse(Job.objects.exists())
+        self.assertEqual(
+            Job.objects.get().name, 'posts.comment_created'
+        )
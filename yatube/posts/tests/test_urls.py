@@ -1,5 +1,6 @@
 from http import HTTPStatus
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, Client
 from ..models import Post, Group
 
@@ -39,6 +40,9 @@ class PostsURLTests(TestCase):
         cls.post_url = f'/posts/{PostsURLTests.post_id}/'
         cls.post_edit_url = f'/posts/{PostsURLTests.post_id}/edit/'
 
+    def setUp(self):
+        cache.clear()
+
     def test_404(self):
         response = PostsURLTests.authorized_client.get(
             '/not_exists/'
@@ -0,0 +1,78 @@
+"""Популярное: экспоненциально затухающие счётчики в кэше.
+
+Вместо того чтобы уменьшать все оценки со временем, вклад события
+увеличивается: log(вес) + t * ln2 / TRENDING_HALF_LIFE. Порядок
+элементов при этом тот же, что у затухающих счётчиков, и обновление
+касается одного элемента. Оценки хранятся в логарифмах, поэтому не
+переполняются.
+
+Для каждой области (посты, посты группы, группы, авторы) в кэше лежат
+не более TRENDING_SIZE лучших элементов и готовый порядок, так что
+чтение страницы -- это срез списка.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+TRENDING_KEY = 'trending:{}'
+POSTS = 'posts'
+GROUPS = 'groups'
+AUTHORS = 'authors'
+
+
+def group_posts_scope(group_id):
+    return f'posts:group:{group_id}'
+
+
+def log_add(first, second):
+    high, low = max(first, second), min(first, second)
+    return high + math.log1p(math.exp(low - high))
+
+
+def event_score(weight=1, now=None):
+    now = time.time() if now is None else now
+    return math.log(weight) + now * math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def bump(scope, item_id, weight=1, now=None):
+    key = TRENDING_KEY.format(scope)
+    board = cache.get(key) or {'scores': {}, 'ranking': []}
+    scores = board['scores']
+    score = event_score(weight, now)
+    if item_id in scores:
+        score = log_add(scores[item_id], score)
+    scores[item_id] = score
+    ranking = sorted(scores, key=scores.get, reverse=True)
+    for dropped in ranking[settings.TRENDING_SIZE:]:
+        del scores[dropped]
+    board['ranking'] = ranking[:settings.TRENDING_SIZE]
+    cache.set(key, board, settings.TRENDING_TIMEOUT)
+
+
+def top(scope, count):
+    """Id самых популярных элементов области, лучшие первыми."""
+    board = cache.get(TRENDING_KEY.format(scope))
+    if board is None:
+        return []
+    return board['ranking'][:count]
+
+
+def record_post(post, now=None):
+    bump(POSTS, post.id, now=now)
+    if post.group_id:
+        bump(group_posts_scope(post.group_id), post.id, now=now)
+        bump(GROUPS, post.group_id, now=now)
+
+
+def record_comment(post, now=None):
+    weight = settings.TRENDING_COMMENT_WEIGHT
+    bump(POSTS, post.id, weight, now)
+    if post.group_id:
+        bump(group_posts_scope(post.group_id), post.id, weight, now)
+        bump(GROUPS, post.group_id, weight, now)
+
+
+def record_follow(author_id, now=None):
+    bump(AUTHORS, author_id, now=now)
@@ -5,14 +5,26 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('events/', views.live_feed, name='index_events'),
+    path('more/', views.feed_fragment, name='index_more'),
+    path('cards/', views.post_cards, name='post_cards'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/more/', views.feed_fragment, name='group_more'),
+    path('group/<slug:slug>/events/', views.live_feed, name='group_events'),
+    path('trending/', views.trending_index, name='trending'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/more/', views.feed_fragment,
+         name='profile_more'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
     path("create/", views.post_create, name="post_create"),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/more/', views.feed_fragment, {'follow': True},
+         name='follow_more'),
+    path('follow/events/', views.live_feed, {'follow': True},
+         name='follow_events'),
     path('profile/<str:username>/follow/',
          views.profile_follow,
          name='profile_follow'),
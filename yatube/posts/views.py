@@ -1,81 +1,150 @@
 from django.shortcuts import render
+from django.core.exceptions import PermissionDenied
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+)
 from django.conf import settings
+from django.db import transaction
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from .models import Group, Post, User, Follow, Comment
+from . import (
+    counts, cursors, follow_graph, live, pages, revisions, trending
+)
+from .archive import ArchiveChain, get_post_or_archived
+from .feeds import GroupFeed
+from .hydration import hydrate_posts
+from .models import Group, Post, User, Follow
 from .forms import PostForm, CommentForm
-from yatube.settings import POSTS_PER_PAGE
-from django.views.decorators.cache import cache_page
-from django.contrib.auth.models import Group as permission
+from .recommendations import recommendations_for
+from django.utils.cache import patch_cache_control
+from django.utils.functional import SimpleLazyObject
+from core import counts as core_counts, pagecache
+from core.paginator import Paginator
 
 
-is_staff = permission.objects.get_or_create(name='staff')
-users_in_stuff = User.objects.filter(groups__name='staff')
+def is_staff_member(user):
+    # Анониму не нужен запрос к группам.
+    return (
+        user.is_authenticated and user.groups.filter(name='staff').exists()
+    )
+
+
+def author_posts(author):
+    """Посты автора вместе с архивом, с числами из core.counts."""
+    posts = author.posts.select_related('group')
+    archived = author.archived_posts.select_related('group')
+    return ArchiveChain(
+        posts, archived,
+        posts_count=core_counts.get_count(
+            counts.author_posts(author.id), posts
+        ).value,
+        archived_count=core_counts.get_count(
+            counts.author_archived_posts(author.id), archived
+        ).value,
+    )
+
+
+def followed_authors(user, page_obj):
+    """Авторы постов страницы, на которых подписан пользователь.
+
+    Множество считается лениво, при отрисовке карточек, по кэшу
+    follow_graph -- не больше одного запроса на страницу. Для гостя
+    None: кнопки подписки не показываются.
+    """
+    if not user.is_authenticated:
+        return None
+    return SimpleLazyObject(lambda: follow_graph.following_among(
+        user.id, {post.author_id for post in page_obj}
+    ))
 
 
-@cache_page(20)
 def index(request):
     template = 'posts/index.html'
     title = 'Последние обновления на сайте'
-    posts = Post.objects.all()
-    paginator = Paginator(posts, 10)
+    pagecache.depends_on(request, pages.INDEX)
+    posts = Post.objects.select_related('author', 'group')
+    total = core_counts.get_count(counts.ALL_POSTS, posts, table=Post)
+    paginator = Paginator(
+        posts, settings.POSTS_PER_PAGE,
+        count=total.value, approximate=total.approximate,
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'title': title,
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'followed_authors': followed_authors(request.user, page_obj),
     }
     return render(request, template, context)
 
 
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, POSTS_PER_PAGE)
+    pagecache.depends_on(request, pages.group_tag(group.id))
+    paginator = Paginator(GroupFeed(group), settings.POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
         'group': group,
+        'followed_authors': followed_authors(request.user, page_obj),
+        'trending_posts': hydrate_posts(trending.top(
+            trending.group_posts_scope(group.id),
+            settings.TRENDING_GROUP_POSTS,
+        )),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+def trending_index(request):
+    pagecache.depends_on(request, pages.TRENDING)
+    group_ids = trending.top(trending.GROUPS, settings.POSTS_PER_PAGE)
+    author_ids = trending.top(trending.AUTHORS, settings.POSTS_PER_PAGE)
+    groups = Group.objects.in_bulk(group_ids)
+    authors = User.objects.in_bulk(author_ids)
+    context = {
+        'posts': hydrate_posts(
+            trending.top(trending.POSTS, settings.POSTS_PER_PAGE)
+        ),
+        'groups': [groups[i] for i in group_ids if i in groups],
+        'authors': [authors[i] for i in author_ids if i in authors],
+    }
+    return render(request, 'posts/trending.html', context)
+
+
 def profile(request, username, following=False):
     author = get_object_or_404(User, username=username)
-    posts = Post.objects.filter(author=author)
-    paginator = Paginator(posts, 10)
+    pagecache.depends_on(request, pages.author_tag(author.id))
+    posts = author_posts(author)
+    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    number_of_posts = posts.count()
+    number_of_posts = paginator.count
     if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            author=author,
-            user=request.user
-        ).exists()
+        following = follow_graph.is_following(request.user.id, author.id)
     context = {
         'author': author,
         'username': username,
         'number_of_posts': number_of_posts,
         'page_obj': page_obj,
-        'following': following
+        'following': following,
+        'recommendations': recommendations_for(request.user),
     }
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    # print(is_staff[0])
-    if request.user in users_in_stuff:
-        permission_check = True
-    else:
-        permission_check = False
-    print(permission_check)
+    post = get_post_or_archived(post_id)
+    if post is None:
+        raise Http404
+    pagecache.depends_on(
+        request, pages.post_tag(post.id), pages.author_tag(post.author_id)
+    )
+    permission_check = is_staff_member(request.user)
     title = str(post.text)[:30]
-    number_of_posts = Post.objects.filter(author=post.author).count()
+    number_of_posts = author_posts(post.author).count()
     form = CommentForm()
-    comments = Comment.objects.filter(post=post)
+    comments = post.comments.select_related('author')
     context = {
         'post': post,
         'title': title,
@@ -101,15 +170,19 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    if post.author != request.user and request.user not in users_in_stuff:
+    if post.author != request.user and not is_staff_member(request.user):
         return redirect('posts:post_detail', post_id=post_id)
+    # Форма меняет post.text уже при проверке.
+    old_text = post.text
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
         instance=post
     )
     if form.is_valid():
-        form.save()
+        with transaction.atomic():
+            form.save()
+            revisions.record_edit(post, old_text, request.user)
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'post': post,
@@ -131,14 +204,27 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+def follow_feed(user, author_ids):
+    if len(author_ids) <= settings.FOLLOW_FEED_MAX_IN:
+        return Post.objects.filter(author_id__in=list(author_ids))
+    return Post.objects.filter(author__following__user=user)
+
+
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(
-        author__following__user=request.user)
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
+    author_ids = follow_graph.following_ids(request.user.id)
+    posts = follow_feed(request.user, author_ids)
+    total = core_counts.get_count(
+        counts.follow_posts(request.user.id), posts,
+        timeout=settings.FOLLOW_COUNT_TIMEOUT,
+    )
+    paginator = Paginator(posts, settings.POSTS_PER_PAGE, count=total.value)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    context = {'page_obj': page_obj}
+    context = {
+        'page_obj': page_obj,
+        'recommendations': recommendations_for(request.user),
+    }
     return render(request, 'posts/follow.html', context)
 
 
@@ -159,3 +245,106 @@ def profile_unfollow(request, username):
     )
     user_follower.delete()
     return redirect('posts:profile', username)
+
+
+def live_feed(request, slug=None, follow=False):
+    if follow:
+        if not request.user.is_authenticated:
+            # На ответ 204 EventSource не переподключается.
+            return HttpResponse(status=204)
+        author_ids = follow_graph.following_ids(request.user.id)
+        posts = follow_feed(request.user, author_ids)
+        channels = [
+            live.author_channel(author_id)
+            for author_id in author_ids[:settings.FOLLOW_FEED_MAX_IN]
+        ]
+    elif slug is not None:
+        group = get_object_or_404(Group, slug=slug)
+        posts = group.posts.all()
+        channels = [live.group_channel(group.id)]
+    else:
+        posts = Post.objects.all()
+        channels = [live.POSTS_CHANNEL]
+    after = (
+        request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('after', '')
+    )
+    stream = live.open_stream(
+        channels, posts, int(after) if cursors.is_id(after) else None
+    )
+    if stream is None:
+        # Мест нет: браузер переподключится через LIVE_BUSY_RETRY_MS.
+        response = HttpResponse(
+            f'retry: {settings.LIVE_BUSY_RETRY_MS}\n\n',
+            content_type='text/event-stream',
+        )
+    else:
+        response = StreamingHttpResponse(
+            stream, content_type='text/event-stream'
+        )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def post_cards(request):
+    post_ids = sorted(
+        {int(post_id) for post_id in request.GET.get('ids', '').split(',')
+         if cursors.is_id(post_id)},
+        reverse=True,
+    )[:settings.POSTS_PER_PAGE]
+    posts = hydrate_posts(post_ids)
+    context = {
+        'posts': posts,
+        'followed_authors': followed_authors(request.user, posts),
+    }
+    return render(request, 'posts/includes/post_cards.html', context)
+
+
+def feed_fragment(request, slug=None, username=None, follow=False):
+    """Следующая порция ленты без base.html: только карточки постов.
+
+    Курсор следующей порции -- в заголовке X-Next-Cursor, на последней
+    порции заголовка нет.
+    """
+    archived_posts = None
+    if follow:
+        if not request.user.is_authenticated:
+            raise PermissionDenied
+        posts = follow_feed(
+            request.user, follow_graph.following_ids(request.user.id)
+        )
+    elif slug is not None:
+        posts = get_object_or_404(Group, slug=slug).posts.all()
+    elif username is not None:
+        author = get_object_or_404(User, username=username)
+        posts = author.posts.all()
+        archived_posts = author.archived_posts.select_related('group')
+    else:
+        posts = Post.objects.all()
+    try:
+        cursor = cursors.decode_cursor(request.GET.get('before'))
+    except ValueError:
+        return HttpResponseBadRequest()
+    count = settings.POSTS_PER_PAGE + 1
+    page = cursors.posts_before(
+        posts.select_related('author', 'group'), cursor, count
+    )
+    if archived_posts is not None and len(page) < count:
+        page += cursors.posts_before(
+            archived_posts.select_related('author'), cursor, count - len(page)
+        )
+    posts = page[:settings.POSTS_PER_PAGE]
+    response = render(request, 'posts/includes/post_cards.html', {
+        'posts': posts,
+        'followed_authors': followed_authors(request.user, posts),
+    })
+    if len(page) == count:
+        response['X-Next-Cursor'] = cursors.encode_cursor(page[-2])
+    # Кнопки подписки зависят от пользователя: его порции -- только
+    # в его браузере. Ложный флаг patch_cache_control записал бы
+    # в заголовок как public=False, поэтому передаётся один.
+    scope = 'private' if request.user.is_authenticated else 'public'
+    patch_cache_control(
+        response, max_age=settings.FEED_FRAGMENT_MAX_AGE, **{scope: True}
+    )
+    return response
@@ -0,0 +1,23 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named
+``application``, e.g. ``uvicorn yatube.asgi:application``. Requests run
+in a pool of ``settings.ASGI_THREADS`` threads, streaming responses in a
+separate pool of ``settings.LIVE_MAX_STREAMS`` threads (see core.asgi).
+"""
+
+import os
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import WsgiToAsgi
+from core.staticfiles import serve_files
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = WsgiToAsgi(
+    serve_files(get_wsgi_application()), settings.ASGI_THREADS,
+    stream_workers=settings.LIVE_MAX_STREAMS,
+)
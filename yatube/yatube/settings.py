@@ -31,23 +31,37 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.RateLimitMiddleware',
+    'core.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Сессии читаются из кэша, база -- только при промахе.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+# Загрузчики сжимают HTML шаблона при компиляции (core.loaders); вне
+# DEBUG скомпилированные шаблоны кэшируются на всё время жизни процесса.
+TEMPLATE_LOADERS = [
+    'core.loaders.FilesystemLoader',
+    'core.loaders.AppDirectoriesLoader',
+]
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -60,11 +74,45 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# Потоков на процесс в ASGI-режиме (yatube/asgi.py): не больше, чем
+# соединений с базой, которые процесс может держать одновременно.
+ASGI_THREADS = 8
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    # Соединения берутся из пула процесса (core.backends.postgresql_pool),
+    # поэтому CONN_MAX_AGE не нужен: закрытие возвращает соединение в пул.
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.backends.postgresql_pool',
+            'NAME': os.getenv('POSTGRES_DB', 'yatube'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'POOL_MIN_SIZE': int(os.getenv('POSTGRES_POOL_MIN_SIZE', 2)),
+            'POOL_MAX_SIZE': int(os.getenv('POSTGRES_POOL_MAX_SIZE', 20)),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+            'CONN_MAX_AGE': 60,
+        }
     }
+
+# Выполняются при открытии каждого соединения с SQLite (core.db).
+# WAL позволяет читать во время записи, NORMAL безопасен в режиме WAL.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -16 * 1024,
+    'temp_store': 'MEMORY',
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -96,11 +144,142 @@ MIN_POST_LEN = 2
 COMMENT_MIN_LEN = 2
 
 POSTS_PER_PAGE = 10
+# Окно номеров страниц (core.paginator): первые и последние
+# PAGINATOR_ON_ENDS страниц и по PAGINATOR_ON_EACH_SIDE вокруг текущей.
+PAGINATOR_ON_EACH_SIDE = 2
+PAGINATOR_ON_ENDS = 1
+# Счётчики постов для пагинации (core.counts): сколько хранить точное
+# число и с какого размера таблицы брать оценку по статистике СУБД.
+# Счётчик ленты подписок не сбрасывается новыми постами авторов,
+# поэтому живёт меньше.
+COUNT_TIMEOUT = 60 * 60
+COUNT_ESTIMATE_THRESHOLD = 100000
+FOLLOW_COUNT_TIMEOUT = 60
+# Счётчики списков админки (CachedCountPaginator) не сбрасываются при
+# изменениях: каждый фильтр даёт свой ключ.
+ADMIN_COUNT_TIMEOUT = 60
+
+# Сколько первых страниц ленты группы отдавать из списка id в кэше
+# (posts.feeds) и как долго этот список хранить.
+GROUP_FEED_PAGES = 5
+GROUP_FEED_TIMEOUT = 60 * 60 * 24
+
+# Срок жизни поста в кэше posts.hydration. Изменения поста сбрасывают
+# кэш сразу, переименование автора или группы видно через этот срок.
+POST_CACHE_TIMEOUT = 60 * 10
+
+# Множества подписок (posts.follow_graph) сбрасываются при изменении
+# Follow, срок жизни нужен только на случай правок в обход ORM.
+FOLLOW_GRAPH_TIMEOUT = 60 * 60 * 24
+# До скольких авторов лента подписок строится через author_id IN (...),
+# при большем числе подписок используется JOIN с Follow.
+FOLLOW_FEED_MAX_IN = 500
+
+# Рекомендации «кого почитать» (manage.py build_recommendations).
+RECOMMENDATIONS_COUNT = 5
+RECOMMENDATIONS_COMMENT_WEIGHT = 0.5
+
+# Популярное (posts.trending): вклад события вдвое уменьшается за
+# TRENDING_HALF_LIFE секунд, в кэше хранится TRENDING_SIZE лучших.
+TRENDING_HALF_LIFE = 60 * 60 * 6
+TRENDING_SIZE = 100
+TRENDING_TIMEOUT = 60 * 60 * 24 * 7
+TRENDING_COMMENT_WEIGHT = 2
+TRENDING_GROUP_POSTS = 5
+
+# Очередь задач core.jobs (manage.py run_jobs). Задачу, которую воркер
+# не завершил за JOBS_LEASE секунд (например, процесс убит), заберёт
+# другой воркер.
+JOBS_MAX_ATTEMPTS = 5
+JOBS_LEASE = 60 * 10
+JOBS_POLL_INTERVAL = 1
+JOBS_KEEP_DONE_DAYS = 7
+JOBS_PROGRESS_TIMEOUT = 60 * 60 * 24
+
+# Брокер событий core.pubsub. LocalBroker работает в пределах процесса,
+# при нескольких процессах нужен CacheBroker и общий кэш.
+PUBSUB_BROKER = 'core.pubsub.LocalBroker'
+PUBSUB_QUEUE_SIZE = 100
+PUBSUB_HISTORY = 100
+PUBSUB_EVENT_TIMEOUT = 60 * 5
+PUBSUB_POLL_INTERVAL = 1
+
+# Живые ленты (posts.live). Поток событий занимает поток сервера, поэтому
+# живёт не дольше LIVE_STREAM_TIMEOUT секунд, затем браузер
+# переподключается через LIVE_RETRY_MS миллисекунд.
+LIVE_STREAM_TIMEOUT = 60
+LIVE_HEARTBEAT = 15
+LIVE_RETRY_MS = 3000
+# Одновременных потоков событий на процесс. Сверх этого клиент сразу
+# получает только retry: LIVE_BUSY_RETRY_MS и переподключается позже. В
+# ASGI-режиме потоки событий выполняются в отдельном пуле такого размера
+# и не занимают ASGI_THREADS.
+LIVE_MAX_STREAMS = 32
+LIVE_BUSY_RETRY_MS = 15000
+
+# Сколько секунд браузер и прокси могут хранить порцию ленты для
+# бесконечной прокрутки (лента подписок -- только в браузере).
+FEED_FRAGMENT_MAX_AGE = 60
+
+# Ограничения частоты (core.ratelimit) по имени URL: не больше limit
+# запросов с методами methods за period секунд от пользователя и не
+# больше ip_limit -- с одного IP-адреса.
+RATELIMITS = {
+    'posts:post_create': {
+        'methods': ['POST'], 'limit': 5, 'ip_limit': 20, 'period': 60,
+    },
+    'posts:add_comment': {
+        'methods': ['POST'], 'limit': 10, 'ip_limit': 40, 'period': 60,
+    },
+    'posts:profile_follow': {
+        'methods': ['GET', 'POST'], 'limit': 30, 'ip_limit': 120,
+        'period': 60,
+    },
+}
+# Адреса обратных прокси, которым можно верить в X-Forwarded-For.
+RATELIMIT_TRUSTED_PROXIES = []
+
+# Кэш страниц для анонимов (core.pagecache): какие представления
+# кэшировать, сколько хранить у себя и сколько разрешать прокси.
+PAGE_CACHE_VIEWS = [
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:trending',
+    'about:author',
+    'about:tech',
+]
+PAGE_CACHE_TIMEOUT = 60 * 10
+PAGE_CACHE_MAX_AGE = 30
+
+# Сколько строк за раз читать при обходе больших выборок (.iterator()).
+# В PostgreSQL обход идёт через серверный курсор.
+ITERATOR_CHUNK_SIZE = 2000
+
+# Посты старше этого срока команда archive_posts переносит в архив.
+POSTS_ARCHIVE_AFTER_DAYS = 365
+POSTS_ARCHIVE_BATCH_SIZE = 500
+
+# История правок постов (posts.revisions): каждая такая версия хранит
+# текст целиком, остальные -- разницу с предыдущей.
+REVISION_SNAPSHOT_EVERY = 10
+
+# Массовые действия модерации в админке (posts.moderation) удаляют и
+# переносят объекты пачками, каждая в своей транзакции.
+MODERATION_CHUNK_SIZE = 200
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [
-    os.path.join(BASE_DIR, "static"),
+    os.path.join(os.path.dirname(BASE_DIR), "static"),
 ]
+# manage.py collectstatic собирает сюда файлы с хэшем в имени и их
+# сжатые копии, yatube/wsgi.py раздаёт их сам (core.staticfiles).
+STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+# Стили, из которых при сборке удаляются правила для классов, не
+# встречающихся в шаблонах и скриптах (core.csspurge).
+STATIC_PURGE_CSS = ['css/bootstrap.min.css']
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -110,6 +289,9 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Сколько браузер хранит загруженные картинки; миниатюры (cache/)
+# неизменяемы и хранятся год (core.staticfiles).
+MEDIA_MAX_AGE = 60 * 60 * 24
 
 CACHES = {
     'default': {
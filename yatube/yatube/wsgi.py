@@ -2,6 +2,8 @@
 WSGI config for yatube project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Collected static and media files are served before Django
+(see core.staticfiles).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
@@ -11,6 +13,8 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from core.staticfiles import serve_files
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
-application = get_wsgi_application()
+application = serve_files(get_wsgi_application())